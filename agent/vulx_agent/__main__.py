@@ -15,28 +15,16 @@ Usage:
     vulx-agent scan --spec ./openapi.yaml --target https://api.example.com
 """
 
+import functools
 import os
 import sys
-import json
-import asyncio
-from datetime import datetime
 from typing import Optional
 import click
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
-from rich import print as rprint
 
-from .scanner import VulxScanner, ScanConfig, ScanType
-from .reporter import ResultReporter
+# Rich, asyncio, aiohttp and the scanner modules are imported lazily inside the
+# commands that need them, keeping cold start cheap for `version` and usage errors.
 
-console = Console()
-
-
-def print_banner():
-    """Print VULX banner"""
-    banner = """
+BANNER = """
 ╔═══════════════════════════════════════════════════════════════╗
 ║                                                               ║
 ║  ██╗   ██╗██╗   ██╗██╗     ██╗  ██╗                          ║
@@ -51,11 +39,70 @@ def print_banner():
 ║                                                               ║
 ╚═══════════════════════════════════════════════════════════════╝
 """
-    console.print(banner, style="bold blue")
+
+DEFAULT_API_URL = "https://api.vulx.io"
+
+SEVERITY_RANK = {"info": 0, "low": 1, "medium": 2, "high": 3, "critical": 4}
+
+SEVERITY_ORDER = ("CRITICAL", "HIGH", "MEDIUM", "LOW", "INFO")
+
+SEVERITY_COLORS = {
+    "CRITICAL": "red",
+    "HIGH": "orange1",
+    "MEDIUM": "yellow",
+    "LOW": "blue",
+    "INFO": "dim"
+}
+
+
+_console = None
+
+
+def get_console():
+    """Return the shared Rich console, importing Rich on first use"""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+
+@functools.lru_cache(maxsize=None)
+def severity_style(severity: str, bold: bool = False):
+    """Pre-built Rich style for a severity, so rows skip style-string parsing"""
+    from rich.style import Style
+
+    color = SEVERITY_COLORS.get(severity, "white")
+    if color == "dim":
+        return Style(dim=True)
+    return Style(color=color, bold=bold)
+
+
+def run_async(coro):
+    """Run a coroutine to completion, on uvloop when it is installed"""
+    import asyncio
+
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(coro)
+
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        return runner.run(coro)
+
+
+def print_banner():
+    """Print VULX banner"""
+    # Plain text: skip Rich's markup parsing and highlighter regexes
+    get_console().print(BANNER, style="bold blue", markup=False, highlight=False)
 
 
 def print_summary(result: dict):
     """Print scan summary"""
+    from rich.panel import Panel
+    from rich.table import Table
+
+    console = get_console()
     summary = result.get("summary", {})
 
     # Create summary table
@@ -63,19 +110,10 @@ def print_summary(result: dict):
     table.add_column("Severity", style="bold")
     table.add_column("Count", justify="right")
 
-    severity_styles = {
-        "CRITICAL": "bold red",
-        "HIGH": "bold orange1",
-        "MEDIUM": "bold yellow",
-        "LOW": "bold blue",
-        "INFO": "dim"
-    }
-
     by_severity = summary.get("by_severity", {})
-    for severity in ["CRITICAL", "HIGH", "MEDIUM", "LOW", "INFO"]:
+    for severity in SEVERITY_ORDER:
         count = by_severity.get(severity, 0)
-        style = severity_styles.get(severity, "white")
-        table.add_row(severity, str(count), style=style)
+        table.add_row(severity, str(count), style=severity_style(severity, bold=True))
 
     table.add_row("", "", style="dim")
     table.add_row("TOTAL", str(summary.get("total", 0)), style="bold white")
@@ -105,39 +143,70 @@ def print_summary(result: dict):
 
 def print_findings(findings: list, show_remediation: bool = False):
     """Print detailed findings"""
+    from rich.table import Table
+
+    console = get_console()
     if not findings:
         console.print("\n[bold green]✓ No vulnerabilities found![/bold green]\n")
         return
 
-    console.print(f"\n[bold]Detailed Findings ({len(findings)} issues)[/bold]\n")
+    table = Table(
+        title=f"Detailed Findings ({len(findings)} issues)",
+        show_header=True,
+        header_style="bold cyan",
+        show_lines=False
+    )
+    table.add_column("#", justify="right", style="dim")
+    table.add_column("Severity", style="bold")
+    table.add_column("Finding")
+    table.add_column("Endpoint", style="cyan")
+    table.add_column("OWASP", style="dim")
+    table.add_column("CWE", style="dim")
+    table.add_column("Description", style="dim")
+    if show_remediation:
+        table.add_column("Fix", style="green")
 
     for i, finding in enumerate(findings, 1):
         severity = finding.get("severity", "INFO")
-        severity_colors = {
-            "CRITICAL": "red",
-            "HIGH": "orange1",
-            "MEDIUM": "yellow",
-            "LOW": "blue",
-            "INFO": "dim"
-        }
-        color = severity_colors.get(severity, "white")
-
-        # Finding header
-        console.print(f"[bold {color}]#{i} [{severity}] {finding.get('title', finding.get('type', 'Unknown'))}[/bold {color}]")
-        console.print(f"   Endpoint: [cyan]{finding.get('method', 'GET')} {finding.get('endpoint', '/')}[/cyan]")
-
-        if finding.get("owasp_category"):
-            console.print(f"   OWASP: [dim]{finding['owasp_category']}[/dim]")
+        row = [
+            str(i),
+            severity,
+            finding.get("title", finding.get("type", "Unknown")),
+            f"{finding.get('method', 'GET')} {finding.get('endpoint', '/')}",
+            finding.get("owasp_category") or "",
+            finding.get("cwe_id") or "",
+            (finding.get("description") or "")[:200]
+        ]
+        if show_remediation:
+            row.append((finding.get("remediation") or "")[:200])
+
+        table.add_row(*row, style=severity_style(severity))
+
+    console.print()
+    console.print(table)
+    console.print()
 
-        if finding.get("cwe_id"):
-            console.print(f"   CWE: [dim]{finding['cwe_id']}[/dim]")
 
-        console.print(f"   [dim]{finding.get('description', '')[:200]}...[/dim]")
+def dedupe_findings(findings: list) -> list:
+    """Drop findings that repeat the same endpoint, method, CWE and title across engines"""
+    seen = set()
+    unique = []
+    for f in findings:
+        key = (f.get("endpoint"), f.get("method"), f.get("cwe_id"), f.get("title"))
+        if key not in seen:
+            seen.add(key)
+            unique.append(f)
+    return unique
 
-        if show_remediation and finding.get("remediation"):
-            console.print(f"   [green]Fix: {finding['remediation'][:200]}...[/green]")
 
-        console.print()
+def parse_auth_headers(auth_header: tuple) -> dict:
+    """Parse repeated 'Header: Value' options, ignoring malformed entries"""
+    headers = {}
+    for h in auth_header:
+        name, sep, value = h.partition(": ")
+        if sep:
+            headers[name] = value
+    return headers
 
 
 @click.group()
@@ -147,50 +216,73 @@ def cli():
     pass
 
 
-@cli.command()
-@click.option("--target", "-t", required=True, help="Target URL to scan")
-@click.option("--spec", "-s", help="OpenAPI specification URL or file path")
-@click.option("--type", "scan_type", type=click.Choice(["quick", "standard", "full"]), default="standard", help="Scan type")
-@click.option("--project-id", "-p", envvar="VULX_PROJECT_ID", help="VULX project ID")
-@click.option("--api-key", "-k", envvar="VULX_API_KEY", help="VULX API key")
-@click.option("--api-url", envvar="VULX_API_URL", default="https://api.vulx.io", help="VULX API URL")
-@click.option("--auth-token", help="Bearer token for authenticated scanning")
-@click.option("--auth-header", multiple=True, help="Custom auth headers (format: 'Header: Value')")
-@click.option("--fail-on", type=click.Choice(["critical", "high", "medium", "low"]), default="high", help="Exit with error if findings at or above this severity")
-@click.option("--output", "-o", type=click.Path(), help="Output file for JSON results")
-@click.option("--show-remediation", is_flag=True, help="Show remediation guidance")
-@click.option("--quiet", "-q", is_flag=True, help="Minimal output")
-@click.option("--json-output", is_flag=True, help="Output results as JSON only")
+# The scan command is assembled once from a flat option list rather than
+# through a stack of decorators that each wrap the callback.
+SCAN_OPTIONS = [
+    click.Option(["--target", "-t"], required=True, help="Target URL to scan"),
+    click.Option(["--spec", "-s"], help="OpenAPI specification URL or file path"),
+    click.Option(["--type", "scan_type"], type=click.Choice(["quick", "standard", "full"]), default="standard", help="Scan type"),
+    click.Option(["--project-id", "-p"], help="VULX project ID [env: VULX_PROJECT_ID]"),
+    click.Option(["--api-key", "-k"], help="VULX API key [env: VULX_API_KEY]"),
+    click.Option(["--api-url"], help=f"VULX API URL [env: VULX_API_URL; default: {DEFAULT_API_URL}]"),
+    click.Option(["--auth-token"], help="Bearer token for authenticated scanning"),
+    click.Option(["--auth-header"], multiple=True, help="Custom auth headers (format: 'Header: Value')"),
+    click.Option(["--fail-on"], type=click.Choice(["critical", "high", "medium", "low"]), default="high", help="Exit with error if findings at or above this severity"),
+    click.Option(["--output", "-o"], type=click.Path(), help="Output file for JSON results"),
+    click.Option(["--show-remediation"], is_flag=True, help="Show remediation guidance"),
+    click.Option(["--quiet", "-q"], is_flag=True, help="Minimal output"),
+    click.Option(["--json-output"], is_flag=True, help="Output results as JSON only"),
+    click.Option(["--no-cache"], is_flag=True, help="Always re-fetch a remote OpenAPI spec instead of using the local cache"),
+    click.Option(["--upload-new-only"], is_flag=True, help="Upload only findings not reported for this project before"),
+]
+
+
 def scan(
     target: str,
     spec: Optional[str],
     scan_type: str,
     project_id: Optional[str],
     api_key: Optional[str],
-    api_url: str,
+    api_url: Optional[str],
     auth_token: Optional[str],
     auth_header: tuple,
     fail_on: str,
     output: Optional[str],
     show_remediation: bool,
     quiet: bool,
-    json_output: bool
+    json_output: bool,
+    no_cache: bool,
+    upload_new_only: bool
 ):
     """Run a security scan against a target API"""
+    import asyncio
+    import orjson
+    from .scanner import VulxScanner, ScanConfig, ScanType
+
+    console = get_console()
+
+    # Platform settings fall back to the environment, read once here
+    env = os.environ
+    project_id = project_id or env.get("VULX_PROJECT_ID")
+    api_key = api_key or env.get("VULX_API_KEY")
+    api_url = api_url or env.get("VULX_API_URL") or DEFAULT_API_URL
 
     if not json_output and not quiet:
         print_banner()
 
-    # Build scan configuration
+    # Build scan configuration, leaving unset fields to the dataclass defaults
+    candidates = {
+        "openapi_spec": spec,
+        "auth_token": auth_token,
+        "auth_headers": parse_auth_headers(auth_header) if auth_header else None,
+        "vulx_api_key": api_key,
+        "vulx_api_url": api_url,
+        "vulx_project_id": project_id
+    }
     config = ScanConfig(
         target_url=target,
-        openapi_spec=spec,
         scan_type=ScanType(scan_type),
-        auth_token=auth_token,
-        auth_headers=dict(h.split(": ", 1) for h in auth_header if ": " in h),
-        vulx_api_key=api_key,
-        vulx_api_url=api_url,
-        vulx_project_id=project_id
+        **{k: v for k, v in candidates.items() if v is not None}
     )
 
     # Run scan
@@ -203,6 +295,8 @@ def scan(
         if json_output or quiet:
             return await scanner.scan()
         else:
+            from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+
             with Progress(
                 SpinnerColumn(),
                 TextColumn("[progress.description]{task.description}"),
@@ -218,63 +312,136 @@ def scan(
                 scanner.on_progress(on_progress)
                 return await scanner.scan()
 
-    try:
-        result = asyncio.run(run_scan())
-    except KeyboardInterrupt:
-        console.print("\n[yellow]Scan cancelled by user[/yellow]")
-        sys.exit(130)
-    except Exception as e:
-        console.print(f"\n[red]Scan failed: {e}[/red]")
-        sys.exit(1)
+    json_options = orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
 
-    # Output results
-    if json_output:
-        print(json.dumps(result, indent=2))
-    else:
-        if not quiet:
-            print_summary(result)
-            print_findings(result.get("findings", []), show_remediation)
-
-            # Compliance summary
-            compliance = result.get("compliance_summary", {})
-            if compliance.get("total_controls_affected", 0) > 0:
-                console.print(Panel(
-                    f"[yellow]Compliance Impact: {compliance['total_controls_affected']} controls affected[/yellow]",
-                    title="Compliance"
-                ))
-
-    # Save to file if requested
-    if output:
-        with open(output, "w") as f:
-            json.dump(result, f, indent=2)
+    def emit_results(result: dict):
+        # Output results
+        if json_output:
+            # Write the encoded bytes directly instead of decoding to str first
+            sys.stdout.flush()
+            sys.stdout.buffer.write(orjson.dumps(result, option=json_options))
+            sys.stdout.buffer.flush()
+        else:
+            if not quiet:
+                print_summary(result)
+                print_findings(result.get("findings", []), show_remediation)
+
+                # Compliance summary
+                compliance = result.get("compliance_summary", {})
+                if compliance.get("total_controls_affected", 0) > 0:
+                    from rich.panel import Panel
+
+                    console.print(Panel(
+                        f"[yellow]Compliance Impact: {compliance['total_controls_affected']} controls affected[/yellow]",
+                        title="Compliance"
+                    ))
+
+    async def write_output(result: dict):
+        # Encode and write off the event loop so the upload can proceed meanwhile
+        def write():
+            with open(output, "wb") as f:
+                f.write(orjson.dumps(result, option=json_options))
+
+        await asyncio.to_thread(write)
         if not quiet:
             console.print(f"\n[green]Results saved to {output}[/green]")
 
-    # Report to VULX platform if configured
-    if api_key and project_id:
+    async def run_upload(result: dict):
+        from .reporter import ResultReporter
+
         if not quiet:
             console.print("\n[dim]Uploading results to VULX platform...[/dim]")
         try:
-            reporter = ResultReporter(api_url, api_key)
-            asyncio.run(reporter.upload_results(project_id, result))
+            if upload_new_only:
+                from .history import FindingHistory, history_path
+
+                history = await asyncio.to_thread(FindingHistory.load, history_path(project_id))
+                new_findings = history.filter_new(target, result.get("findings", []))
+                if not quiet:
+                    console.print(f"[dim]{len(new_findings)} new findings since previous uploads[/dim]")
+                # Counts must describe the findings actually uploaded
+                from collections import Counter
+                from .scanner import summarize
+
+                summary, risk_score, compliance_summary = summarize(
+                    Counter(f.get("severity", "INFO") for f in new_findings)
+                )
+                result = {
+                    **result,
+                    "findings": new_findings,
+                    "summary": summary,
+                    "risk_score": risk_score,
+                    "compliance_summary": compliance_summary
+                }
+
+            async with ResultReporter(api_url, api_key) as reporter:
+                await reporter.upload_results(project_id, result)
+
+            if upload_new_only:
+                # Only record findings once the platform has them
+                history.update(target, new_findings)
+                await asyncio.to_thread(history.save)
             if not quiet:
                 console.print("[green]✓ Results uploaded successfully[/green]")
         except Exception as e:
             if not quiet:
                 console.print(f"[yellow]Warning: Failed to upload results: {e}[/yellow]")
 
+    async def main_flow() -> dict:
+        # Scan, report and upload share one event loop
+        if spec and not no_cache:
+            from .spec_cache import resolve_spec
+
+            config.openapi_spec = await resolve_spec(spec)
+
+        async with scanner:
+            result = await run_scan()
+
+        # Cross-engine duplicates shrink both the rendered table and the upload
+        findings = result.get("findings", [])
+        unique = dedupe_findings(findings)
+        if len(unique) != len(findings):
+            from collections import Counter
+            from .scanner import summarize
+
+            result["findings"] = unique
+            (result["summary"], result["risk_score"],
+             result["compliance_summary"]) = summarize(Counter(f.get("severity", "INFO") for f in unique))
+
+        emit_results(result)
+
+        # Save to file and report to VULX platform concurrently, if configured
+        io_tasks = []
+        if output:
+            io_tasks.append(write_output(result))
+        if api_key and project_id:
+            io_tasks.append(run_upload(result))
+        await asyncio.gather(*io_tasks)
+
+        return result
+
+    try:
+        result = run_async(main_flow())
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Scan cancelled by user[/yellow]")
+        sys.exit(130)
+    except Exception as e:
+        console.print(f"\n[red]Scan failed: {e}[/red]")
+        sys.exit(1)
+
     # Determine exit code based on findings
-    severity_levels = ["info", "low", "medium", "high", "critical"]
-    fail_threshold = severity_levels.index(fail_on)
-
-    findings = result.get("findings", [])
-    for finding in findings:
-        finding_severity = finding.get("severity", "INFO").lower()
-        if finding_severity in severity_levels:
-            if severity_levels.index(finding_severity) >= fail_threshold:
-                if not quiet:
-                    console.print(f"\n[red]✗ Failing due to {finding_severity.upper()} severity finding(s)[/red]")
-                sys.exit(1)
+    fail_threshold = SEVERITY_RANK[fail_on]
+    failing = next(
+        (
+            f for f in result.get("findings", [])
+            if SEVERITY_RANK.get(f.get("severity", "INFO").lower(), -1) >= fail_threshold
+        ),
+        None
+    )
+    if failing is not None:
+        if not quiet:
+            console.print(f"\n[red]✗ Failing due to {failing.get('severity', 'INFO').upper()} severity finding(s)[/red]")
+        sys.exit(1)
 
     if not quiet:
         console.print("\n[green]✓ Scan completed successfully[/green]")
@@ -282,19 +449,27 @@ def scan(
     sys.exit(0)
 
 
+cli.add_command(click.Command("scan", params=SCAN_OPTIONS, callback=scan, help=scan.__doc__))
+
+
 @cli.command()
 @click.option("--api-key", "-k", envvar="VULX_API_KEY", required=True, help="VULX API key")
-@click.option("--api-url", envvar="VULX_API_URL", default="https://api.vulx.io", help="VULX API URL")
+@click.option("--api-url", envvar="VULX_API_URL", default=DEFAULT_API_URL, help="VULX API URL")
 def auth(api_key: str, api_url: str):
     """Verify authentication with VULX platform"""
+    from .reporter import ResultReporter
+
+    console = get_console()
     print_banner()
 
     console.print("\n[bold]Verifying authentication...[/bold]\n")
 
-    reporter = ResultReporter(api_url, api_key)
+    async def run_verify():
+        async with ResultReporter(api_url, api_key) as reporter:
+            return await reporter.verify_auth()
 
     try:
-        result = asyncio.run(reporter.verify_auth())
+        result = run_async(run_verify())
         if result.get("valid"):
             console.print("[green]✓ Authentication successful![/green]")
             console.print(f"  Organization: {result.get('organization', 'N/A')}")
@@ -310,8 +485,8 @@ def auth(api_key: str, api_url: str):
 @cli.command()
 def version():
     """Show version information"""
-    console.print(f"VULX Scanner Agent v1.0.0")
-    console.print(f"Python {sys.version}")
+    click.echo("VULX Scanner Agent v1.0.0")
+    click.echo(f"Python {sys.version}")
 
 
 if __name__ == "__main__":
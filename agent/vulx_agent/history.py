@@ -0,0 +1,104 @@
+"""
+VULX Finding History
+====================
+Per-project record of findings already reported to the VULX platform.
+
+Continuous scanning of the same target reports largely the same findings
+every run. With ``--upload-new-only`` the agent checks each finding against
+an on-disk Bloom filter at ``~/.vulx/dedup-<project_id>.bloom`` and uploads
+only those not seen before. A false positive means an occasional new
+finding is held back as a "duplicate"; the filter is sized so this stays
+around 1%.
+"""
+
+import hashlib
+import math
+import os
+import struct
+from pathlib import Path
+from typing import Dict, List
+
+import structlog
+
+logger = structlog.get_logger()
+
+HISTORY_CAPACITY = 1_000_000
+HISTORY_ERROR_RATE = 0.01
+
+_MAGIC = b"VXBF"
+_HEADER = struct.Struct("<4sQB")  # magic, bit count, hash count
+
+
+def history_path(project_id: str) -> Path:
+    """Location of a project's finding history"""
+    return Path.home() / ".vulx" / f"dedup-{project_id}.bloom"
+
+
+def finding_key(target_url: str, finding: Dict) -> bytes:
+    """Stable identity of a finding across scans"""
+    return "\x1f".join((
+        target_url,
+        str(finding.get("type")),
+        str(finding.get("endpoint")),
+        str(finding.get("method"))
+    )).encode()
+
+
+class FindingHistory:
+    """Bloom filter of finding keys, persisted to a single file"""
+
+    def __init__(self, path: Path, capacity: int = HISTORY_CAPACITY, error_rate: float = HISTORY_ERROR_RATE):
+        self.path = path
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    @classmethod
+    def load(cls, path: Path, **kwargs) -> "FindingHistory":
+        """Load a history from disk, starting empty if it is missing or unreadable"""
+        history = cls(path, **kwargs)
+        try:
+            data = path.read_bytes()
+            magic, size, hashes = _HEADER.unpack_from(data)
+            bits = bytearray(data[_HEADER.size:])
+            if magic != _MAGIC or len(bits) != (size + 7) // 8:
+                raise ValueError("corrupt history file")
+            history.size, history.hashes, history.bits = size, hashes, bits
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning("Ignoring unreadable finding history", path=str(path), error=str(e))
+        return history
+
+    def save(self):
+        """Write the history atomically"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_bytes(_HEADER.pack(_MAGIC, self.size, self.hashes) + self.bits)
+        os.replace(tmp, self.path)
+
+    def _positions(self, key: bytes):
+        # Double hashing: k positions from two independent 64-bit halves
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def __contains__(self, key: bytes) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key: bytes):
+        bits = self.bits
+        for p in self._positions(key):
+            bits[p >> 3] |= 1 << (p & 7)
+
+    def filter_new(self, target_url: str, findings: List[Dict]) -> List[Dict]:
+        """Findings whose keys are not yet in the history"""
+        return [f for f in findings if finding_key(target_url, f) not in self]
+
+    def update(self, target_url: str, findings: List[Dict]):
+        """Record findings as reported"""
+        for f in findings:
+            self.add(finding_key(target_url, f))
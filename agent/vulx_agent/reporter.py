@@ -4,31 +4,99 @@ VULX Result Reporter
 Uploads scan results to VULX platform.
 """
 
-import aiohttp
-from typing import Dict, Any, Optional
+import gzip
+import zlib
+import httpx
+import orjson
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+from typing import AsyncIterator, Dict, Any, Optional
 import structlog
 
 logger = structlog.get_logger()
 
+# Bodies larger than this are gzip-streamed in chunks instead of compressed in one go
+STREAM_THRESHOLD = 1024 * 1024
+STREAM_CHUNK_SIZE = 256 * 1024
+
+# Creating a scan is not idempotent, so only failures where the platform
+# cannot have accepted the request are retried: connection errors and
+# explicit "try again" statuses. A read timeout or 502/504 may arrive after
+# the scan was stored, and a retry would duplicate it.
+RETRY_STATUSES = frozenset({429, 503})
+RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+MAX_ATTEMPTS = 5
+
+
+class _RetryableStatus(Exception):
+    """Raised internally when the platform answers with a transient status"""
+
+    def __init__(self, response: httpx.Response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+async def _gzip_stream(payload: bytes, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield a gzip-compressed body chunk by chunk"""
+    compressor = zlib.compressobj(1, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    view = memoryview(payload)
+    for offset in range(0, len(view), chunk_size):
+        chunk = compressor.compress(view[offset:offset + chunk_size])
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
 
 class ResultReporter:
-    """Reports scan results to VULX platform"""
+    """
+    Reports scan results to VULX platform.
+
+    Use as an async context manager so every request shares one pooled
+    HTTP/2 client:
+
+        async with ResultReporter(api_url, api_key) as reporter:
+            await reporter.upload_results(project_id, results)
+    """
 
     def __init__(self, api_url: str, api_key: str):
         self.api_url = api_url.rstrip("/")
         self.api_key = api_key
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "ResultReporter":
+        self._client = httpx.AsyncClient(
+            http2=True,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_connections=32, keepalive_expiry=60)
+            )
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self):
+        """Close the underlying HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client (only available inside ``async with``)"""
+        if self._client is None or self._client.is_closed:
+            raise RuntimeError("ResultReporter must be used as an async context manager")
+        return self._client
 
     async def verify_auth(self) -> Dict[str, Any]:
         """Verify API key authentication"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{self.api_url}/auth/verify",
-                headers={"Authorization": f"Bearer {self.api_key}"}
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    return {"valid": False}
+        response = await self.client.get(f"{self.api_url}/auth/verify")
+        if response.status_code == 200:
+            return orjson.loads(response.content)
+        else:
+            return {"valid": False}
 
     async def upload_results(
         self,
@@ -38,6 +106,9 @@ class ResultReporter:
         """
         Upload scan results to VULX platform.
 
+        Connection failures and 429/503 responses are retried with
+        exponential backoff.
+
         Args:
             project_id: Project ID
             results: Scan results
@@ -45,31 +116,54 @@ class ResultReporter:
         Returns:
             Upload response
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.api_url}/projects/{project_id}/scans",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json=results
-            ) as response:
-                if response.status in [200, 201]:
-                    data = await response.json()
-                    logger.info("Results uploaded", scan_id=data.get("id"))
-                    return data
-                else:
-                    error = await response.text()
-                    logger.error("Upload failed", status=response.status, error=error)
-                    raise Exception(f"Upload failed: {error}")
+        payload = orjson.dumps(results)
+        if len(payload) > STREAM_THRESHOLD:
+            # A fresh stream per attempt, since a consumed generator cannot be replayed
+            make_body = lambda: _gzip_stream(payload)
+        else:
+            compressed = gzip.compress(payload, compresslevel=1)
+            make_body = lambda: compressed
+
+        response = await self._post_with_retry(
+            f"{self.api_url}/projects/{project_id}/scans",
+            make_body,
+            headers={
+                "Content-Type": "application/json",
+                "Content-Encoding": "gzip"
+            }
+        )
+
+        if response.status_code in [200, 201]:
+            data = orjson.loads(response.content)
+            logger.info("Results uploaded", scan_id=data.get("id"))
+            return data
+        else:
+            error = response.text
+            logger.error("Upload failed", status=response.status_code, error=error)
+            raise Exception(f"Upload failed: {error}")
+
+    async def _post_with_retry(self, url: str, make_body, headers: Dict[str, str]) -> httpx.Response:
+        """POST with exponential backoff on failures the server did not act on"""
+        try:
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(MAX_ATTEMPTS),
+                wait=wait_exponential(multiplier=0.5, max=8),
+                retry=retry_if_exception_type((*RETRY_ERRORS, _RetryableStatus)),
+                reraise=True
+            ):
+                with attempt:
+                    response = await self.client.post(url, content=make_body(), headers=headers)
+                    if response.status_code in RETRY_STATUSES:
+                        logger.warning("Transient upload failure, retrying", status=response.status_code)
+                        raise _RetryableStatus(response)
+        except _RetryableStatus as e:
+            # Out of attempts: hand the last response back to the caller
+            return e.response
+        return response
 
     async def get_project(self, project_id: str) -> Optional[Dict[str, Any]]:
         """Get project details"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{self.api_url}/projects/{project_id}",
-                headers={"Authorization": f"Bearer {self.api_key}"}
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                return None
+        response = await self.client.get(f"{self.api_url}/projects/{project_id}")
+        if response.status_code == 200:
+            return orjson.loads(response.content)
+        return None
@@ -5,16 +5,16 @@ Core scanning functionality for the VULX agent.
 """
 
 import asyncio
+import itertools
 import os
-import json
+import re
 import subprocess
-import tempfile
 import uuid
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List, Dict, Any, Callable
-import aiohttp
+from typing import Optional, List, Dict, Any, Callable, Mapping
+import orjson
 import structlog
 
 logger = structlog.get_logger()
@@ -27,6 +27,55 @@ class ScanType(Enum):
     FULL = "full"        # All engines including ZAP
 
 
+# Nuclei template directories known to be installed, shared by every
+# scanner in the process so repeat scans skip the check and install
+_READY_TEMPLATE_DIRS: set = set()
+
+# Nuclei -jsonl lines embed full request/response bodies, far past the 64 KiB
+# asyncio StreamReader default
+NUCLEI_STREAM_LIMIT = 16 * 1024 * 1024
+
+# VULX severities, most severe first
+SEVERITY_ORDER = ("CRITICAL", "HIGH", "MEDIUM", "LOW", "INFO")
+SEVERITY_INDEX = {severity: i for i, severity in enumerate(SEVERITY_ORDER)}
+
+# Nuclei severity -> VULX severity
+SEVERITY_MAP = {"critical": "CRITICAL", "high": "HIGH", "medium": "MEDIUM", "low": "LOW", "info": "INFO"}
+
+# ZAP risk -> VULX severity
+RISK_MAP = {"Informational": "INFO", "Low": "LOW", "Medium": "MEDIUM", "High": "HIGH"}
+
+# Risk score contribution per finding
+RISK_WEIGHTS = {"CRITICAL": 25, "HIGH": 15, "MEDIUM": 5, "LOW": 2, "INFO": 0}
+
+# Title keyword -> OWASP API category; the first match wins, so order matters
+OWASP_MAPPINGS = (
+    ("sql", "API1:2023 - Broken Object Level Authorization"),
+    ("xss", "API8:2023 - Security Misconfiguration"),
+    ("auth", "API2:2023 - Broken Authentication"),
+    ("ssrf", "API7:2023 - Server Side Request Forgery")
+)
+
+# All keywords matched in one regex pass; the lookahead also reports
+# overlapping keywords so mapping order can still pick the winner
+OWASP_KEYWORD_RE = re.compile("(?=(" + "|".join(re.escape(kw) for kw, _ in OWASP_MAPPINGS) + "))")
+OWASP_KEYWORD_PRIORITY = {kw: i for i, (kw, _) in enumerate(OWASP_MAPPINGS)}
+
+# Schemathesis output lines reporting a failed check
+SCHEMATHESIS_FAILURE_RE = re.compile(rb"FAILED|ERROR")
+
+# Frameworks counted as affected by a finding of the given severity
+HIGH_SEVERITY_FRAMEWORKS = ("soc2", "pci_dss", "hipaa", "gdpr")
+MEDIUM_SEVERITY_FRAMEWORKS = ("soc2", "pci_dss")
+
+# Progress label, percent and message reported when each engine starts
+ENGINE_PROGRESS = {
+    "nuclei": ("Nuclei", 10, "Running vulnerability detection"),
+    "schemathesis": ("Schemathesis", 40, "Running API fuzzing"),
+    "zap": ("ZAP", 60, "Running deep DAST scan")
+}
+
+
 @dataclass
 class ScanConfig:
     """Scan configuration"""
@@ -41,6 +90,79 @@ class ScanConfig:
     vulx_api_key: Optional[str] = None
     vulx_api_url: str = "https://api.vulx.io"
     vulx_project_id: Optional[str] = None
+    max_parallel_engines: int = 3
+    nuclei_templates_dir: Optional[str] = None  # default: $NUCLEI_TEMPLATES_PATH, else ~/.vulx/nuclei-templates
+
+
+@dataclass(slots=True)
+class Finding:
+    """Security finding reported by one of the engines"""
+    id: str
+    engine: str  # nuclei, schemathesis, zap
+    type: str
+    severity: str  # CRITICAL, HIGH, MEDIUM, LOW, INFO
+    confidence: str
+    title: str
+    description: str
+    endpoint: str
+    method: str
+    parameter: Optional[str] = None
+    evidence: Optional[str] = None
+    remediation: Optional[str] = None
+    cwe_id: Optional[str] = None
+    owasp_category: Optional[str] = None
+    references: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Shallow, unlike dataclasses.asdict, which deep-copies every field
+        return {name: getattr(self, name) for name in FINDING_FIELDS}
+
+
+FINDING_FIELDS = tuple(f.name for f in fields(Finding))
+
+
+def _owasp_category(title: str) -> Optional[str]:
+    """OWASP category of the first mapping keyword found in a title"""
+    best = None
+    for match in OWASP_KEYWORD_RE.finditer(title.lower()):
+        priority = OWASP_KEYWORD_PRIORITY[match.group(1)]
+        if best is None or priority < best:
+            best = priority
+            if best == 0:
+                break
+    return OWASP_MAPPINGS[best][1] if best is not None else None
+
+
+def summarize(severities: Mapping[str, int]) -> tuple:
+    """Summary, risk score and compliance impact from per-severity counts"""
+    by_severity = dict.fromkeys(SEVERITY_ORDER, 0)
+    by_severity.update(severities)
+
+    summary = {
+        "total": sum(severities.values()),
+        "by_severity": by_severity,
+        "critical_count": by_severity["CRITICAL"],
+        "high_count": by_severity["HIGH"],
+        "actionable": by_severity["CRITICAL"] + by_severity["HIGH"]
+    }
+    # Heaviest severities first, stopping once the score is capped
+    risk_score = 0
+    for severity in SEVERITY_ORDER:
+        risk_score += RISK_WEIGHTS[severity] * by_severity[severity]
+        if risk_score >= 100:
+            risk_score = 100
+            break
+
+    affected_frameworks = set()
+    if summary["actionable"]:
+        affected_frameworks.update(HIGH_SEVERITY_FRAMEWORKS)
+    elif by_severity["MEDIUM"]:
+        affected_frameworks.update(MEDIUM_SEVERITY_FRAMEWORKS)
+    compliance_summary = {
+        "frameworks_affected": list(affected_frameworks),
+        "total_controls_affected": len(affected_frameworks) * 3  # Estimate
+    }
+    return summary, risk_score, compliance_summary
 
 
 class VulxScanner:
@@ -51,12 +173,48 @@ class VulxScanner:
     - Nuclei for CVE/misconfiguration detection
     - Schemathesis for API fuzzing
     - OWASP ZAP for full DAST
+
+    Use as an async context manager so the HTTP session shared by the
+    engines is closed afterwards:
+
+        async with VulxScanner(config) as scanner:
+            results = await scanner.scan()
     """
 
     def __init__(self, config: ScanConfig):
         self.config = config
         self.scan_id = str(uuid.uuid4())
         self._progress_callbacks: List[Callable] = []
+        self._engine_sem = asyncio.Semaphore(config.max_parallel_engines)
+        self._http = None
+        self._id_counter = itertools.count()
+
+    async def __aenter__(self) -> "VulxScanner":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+    def _http_session(self):
+        """Shared aiohttp session, created on first use so quick scans never load aiohttp"""
+        if self._http is None or self._http.closed:
+            import aiohttp
+
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+            )
+        return self._http
+
+    def _next_id(self) -> str:
+        """Short finding ID, unique within this scan"""
+        return f"{next(self._id_counter):08x}"
 
     def on_progress(self, callback: Callable[[str, int, str], None]):
         """Register progress callback"""
@@ -67,8 +225,8 @@ class VulxScanner:
         for callback in self._progress_callbacks:
             try:
                 callback(status, percent, message)
-            except Exception:
-                pass
+            except (TypeError, ValueError) as e:
+                logger.debug("Progress callback failed", error=str(e))
 
     async def scan(self) -> Dict[str, Any]:
         """
@@ -78,49 +236,34 @@ class VulxScanner:
             Scan results with findings
         """
         started_at = datetime.utcnow()
-        findings: List[Dict] = []
+        findings: List[Finding] = []
         engines_used: List[str] = []
 
         logger.info("Starting scan", target=self.config.target_url, scan_type=self.config.scan_type.value)
 
         try:
-            # Phase 1: Quick scan with Nuclei
-            self._notify_progress("Nuclei", 10, "Running vulnerability detection")
-            nuclei_findings = await self._run_nuclei()
-            findings.extend(nuclei_findings)
-            engines_used.append("nuclei")
-            logger.info("Nuclei complete", findings=len(nuclei_findings))
-
-            if self.config.scan_type in [ScanType.STANDARD, ScanType.FULL]:
-                # Phase 2: API Fuzzing with Schemathesis
-                if self.config.openapi_spec:
-                    self._notify_progress("Schemathesis", 40, "Running API fuzzing")
-                    schema_findings = await self._run_schemathesis()
-                    findings.extend(schema_findings)
-                    engines_used.append("schemathesis")
-                    logger.info("Schemathesis complete", findings=len(schema_findings))
-
-            if self.config.scan_type == ScanType.FULL:
-                # Phase 3: Full DAST with ZAP
-                self._notify_progress("ZAP", 60, "Running deep DAST scan")
-                zap_findings = await self._run_zap()
-                findings.extend(zap_findings)
-                engines_used.append("zap")
-                logger.info("ZAP complete", findings=len(zap_findings))
-
-            # Deduplicate and enrich findings
+            # Engines are independent external processes, so run them
+            # concurrently; the semaphore caps how many hit the target at once
+            tasks = [
+                asyncio.create_task(self._run_engine(engine, getattr(self, f"_run_{engine}")))
+                for engine in self._select_engines()
+            ]
+
+            for result in await asyncio.gather(*tasks, return_exceptions=True):
+                if isinstance(result, BaseException):
+                    logger.error("Engine failed", error=str(result))
+                    continue
+                engine, engine_findings = result
+                findings.extend(engine_findings)
+                engines_used.append(engine)
+
+            # Deduplicate, enrich and summarise findings
             self._notify_progress("Analyzing", 90, "Processing results")
-            findings = self._deduplicate_findings(findings)
-            findings = self._enrich_findings(findings)
+            findings, summary, risk_score, compliance_summary = self._finalize(findings)
 
             completed_at = datetime.utcnow()
             duration = int((completed_at - started_at).total_seconds())
 
-            # Calculate summary
-            summary = self._calculate_summary(findings)
-            risk_score = self._calculate_risk_score(findings)
-            compliance_summary = self._get_compliance_summary(findings)
-
             self._notify_progress("Complete", 100, "Scan finished")
 
             return {
@@ -131,7 +274,7 @@ class VulxScanner:
                 "started_at": started_at.isoformat(),
                 "completed_at": completed_at.isoformat(),
                 "duration_seconds": duration,
-                "findings": findings,
+                "findings": [f.to_dict() for f in findings],
                 "summary": summary,
                 "engines_used": engines_used,
                 "risk_score": risk_score,
@@ -146,26 +289,77 @@ class VulxScanner:
                 "scan_type": self.config.scan_type.value,
                 "status": "FAILED",
                 "error": str(e),
-                "findings": findings,
+                "findings": [f.to_dict() for f in findings],
                 "summary": {"error": str(e)}
             }
 
-    async def _run_nuclei(self) -> List[Dict]:
+    def _select_engines(self) -> List[str]:
+        """Engines that take part in this scan"""
+        engines = ["nuclei"]
+        if self.config.scan_type in [ScanType.STANDARD, ScanType.FULL] and self.config.openapi_spec:
+            engines.append("schemathesis")
+        if self.config.scan_type == ScanType.FULL:
+            engines.append("zap")
+        return engines
+
+    async def _run_engine(self, name: str, run: Callable) -> tuple:
+        """Run one engine under the engine semaphore"""
+        label, percent, message = ENGINE_PROGRESS[name]
+        async with self._engine_sem:
+            self._notify_progress(label, percent, message)
+            engine_findings = await run()
+        logger.info(f"{label} complete", findings=len(engine_findings))
+        return name, engine_findings
+
+    async def _ensure_nuclei_templates(self) -> str:
+        """Return the Nuclei templates directory, installing templates on first use"""
+        # The agent image ships templates and points NUCLEI_TEMPLATES_PATH at them
+        templates_dir = (
+            self.config.nuclei_templates_dir
+            or os.environ.get("NUCLEI_TEMPLATES_PATH")
+            or os.path.expanduser("~/.vulx/nuclei-templates")
+        )
+        if templates_dir in _READY_TEMPLATE_DIRS or os.path.isdir(templates_dir):
+            _READY_TEMPLATE_DIRS.add(templates_dir)
+            return templates_dir
+
+        logger.info("Installing Nuclei templates", path=templates_dir)
+        process = await asyncio.create_subprocess_exec(
+            "nuclei", "-update-templates", "-update-template-dir", templates_dir, "-silent",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        try:
+            await asyncio.wait_for(process.wait(), timeout=300)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise RuntimeError("Nuclei template install timed out") from None
+
+        if process.returncode != 0 or not os.path.isdir(templates_dir):
+            raise RuntimeError(f"Nuclei template install failed (exit code {process.returncode})")
+        _READY_TEMPLATE_DIRS.add(templates_dir)
+        return templates_dir
+
+    async def _run_nuclei(self) -> List[Finding]:
         """Run Nuclei vulnerability scanner"""
         findings = []
+        process = None
 
         try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-                results_path = f.name
+            templates_dir = await self._ensure_nuclei_templates()
 
             cmd = [
                 "nuclei",
                 "-target", self.config.target_url,
-                "-json-export", results_path,
+                "-jsonl",
                 "-severity", "critical,high,medium,low",
                 "-silent",
                 "-no-color",
-                "-rate-limit", str(self.config.rate_limit)
+                "-rate-limit", str(self.config.rate_limit),
+                # Scan from the persistent templates without checking for updates
+                "-disable-update-check",
+                "-templates", templates_dir
             ]
 
             # Add auth headers
@@ -175,29 +369,28 @@ class VulxScanner:
             for header, value in self.config.auth_headers.items():
                 cmd.extend(["-header", f"{header}: {value}"])
 
-            # Run nuclei
+            # Run nuclei, parsing JSONL results from stdout as they arrive
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.DEVNULL,
+                limit=NUCLEI_STREAM_LIMIT
             )
 
-            await asyncio.wait_for(process.communicate(), timeout=600)
-
-            # Parse results
-            if os.path.exists(results_path):
-                with open(results_path, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            try:
-                                result = json.loads(line)
-                                finding = self._nuclei_to_finding(result)
-                                if finding:
-                                    findings.append(finding)
-                            except json.JSONDecodeError:
-                                continue
-                os.unlink(results_path)
+            async def read_results():
+                # Drain stdout before waiting so a full pipe cannot stall nuclei
+                async for line in process.stdout:
+                    # Raw bytes straight into orjson; blank lines fail to parse and are skipped
+                    try:
+                        result = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        continue
+                    finding = self._nuclei_to_finding(result)
+                    if finding:
+                        findings.append(finding)
+                await process.wait()
+
+            await asyncio.wait_for(read_results(), timeout=600)
 
         except FileNotFoundError:
             logger.warning("Nuclei not found, skipping")
@@ -205,16 +398,18 @@ class VulxScanner:
             logger.warning("Nuclei scan timed out")
         except Exception as e:
             logger.error("Nuclei error", error=str(e))
+        finally:
+            # Never leave nuclei running (and blocked on a full pipe) after an error
+            if process is not None and process.returncode is None:
+                process.kill()
+                await process.wait()
 
         return findings
 
-    async def _run_schemathesis(self) -> List[Dict]:
-        """Run Schemathesis API fuzzing"""
+    async def _run_schemathesis(self) -> List[Finding]:
+        """Run Schemathesis API fuzzing (only selected when a spec is configured)"""
         findings = []
 
-        if not self.config.openapi_spec:
-            return findings
-
         try:
             cmd = [
                 "schemathesis", "run",
@@ -236,27 +431,32 @@ class VulxScanner:
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.DEVNULL
             )
 
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=900)
-
-            # Parse output for failures
-            output = stdout.decode() if stdout else ""
-            for line in output.split("\n"):
-                if "FAILED" in line or "ERROR" in line:
-                    findings.append({
-                        "id": f"schema-{uuid.uuid4().hex[:8]}",
-                        "engine": "schemathesis",
-                        "type": "API Fuzzing Failure",
-                        "severity": "MEDIUM",
-                        "confidence": "HIGH",
-                        "title": "API endpoint returned unexpected response",
-                        "description": line.strip(),
-                        "endpoint": "/",
-                        "method": "GET",
-                        "owasp_category": "API8:2023 - Security Misconfiguration"
-                    })
+            async def read_failures():
+                # Check raw lines as they arrive; only matches are decoded
+                async for raw in process.stdout:
+                    if SCHEMATHESIS_FAILURE_RE.search(raw):
+                        findings.append(Finding(
+                            id=f"schema-{self._next_id()}",
+                            engine="schemathesis",
+                            type="API Fuzzing Failure",
+                            severity="MEDIUM",
+                            confidence="HIGH",
+                            title="API endpoint returned unexpected response",
+                            description=raw.strip().decode("utf-8", errors="replace"),
+                            endpoint="/",
+                            method="GET",
+                            owasp_category="API8:2023 - Security Misconfiguration"
+                        ))
+                await process.wait()
+
+            try:
+                await asyncio.wait_for(read_failures(), timeout=900)
+            except asyncio.TimeoutError:
+                process.kill()
+                raise
 
         except FileNotFoundError:
             logger.warning("Schemathesis not found, skipping")
@@ -267,7 +467,7 @@ class VulxScanner:
 
         return findings
 
-    async def _run_zap(self) -> List[Dict]:
+    async def _run_zap(self) -> List[Finding]:
         """Run OWASP ZAP DAST scan"""
         findings = []
 
@@ -278,146 +478,129 @@ class VulxScanner:
             zap_port = os.environ.get("ZAP_PORT", "8090")
             zap_url = f"http://localhost:{zap_port}"
 
-            async with aiohttp.ClientSession() as session:
-                # Quick spider
-                async with session.get(
-                    f"{zap_url}/JSON/spider/action/scan/",
-                    params={"url": self.config.target_url}
-                ) as resp:
-                    if resp.status != 200:
-                        logger.warning("ZAP spider failed")
-                        return findings
-
-                # Wait for spider
-                await asyncio.sleep(30)
-
-                # Get alerts
-                async with session.get(
-                    f"{zap_url}/JSON/core/view/alerts/",
-                    params={"baseurl": self.config.target_url}
-                ) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        for alert in data.get("alerts", []):
-                            finding = self._zap_to_finding(alert)
-                            if finding:
-                                findings.append(finding)
+            session = self._http_session()
+
+            # Quick spider
+            async with session.get(
+                f"{zap_url}/JSON/spider/action/scan/",
+                params={"url": self.config.target_url}
+            ) as resp:
+                if resp.status != 200:
+                    logger.warning("ZAP spider failed")
+                    return findings
+                spider_id = orjson.loads(await resp.read()).get("scan")
+
+            # Wait for the spider to finish, polling with backoff
+            async def wait_for_spider():
+                delay = 0.5
+                while True:
+                    async with session.get(
+                        f"{zap_url}/JSON/spider/view/status/",
+                        params={"scanId": spider_id}
+                    ) as resp:
+                        status = int(orjson.loads(await resp.read()).get("status", 0))
+                    if status >= 100:
+                        return
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 1.5, 10)
+
+            try:
+                await asyncio.wait_for(wait_for_spider(), timeout=self.config.timeout * 10)
+            except asyncio.TimeoutError:
+                logger.warning("ZAP spider still running, collecting partial alerts")
+
+            # Get alerts
+            async with session.get(
+                f"{zap_url}/JSON/core/view/alerts/",
+                params={"baseurl": self.config.target_url}
+            ) as resp:
+                if resp.status == 200:
+                    data = orjson.loads(await resp.read())
+                    for alert in data.get("alerts", []):
+                        finding = self._zap_to_finding(alert)
+                        if finding:
+                            findings.append(finding)
 
         except Exception as e:
             logger.warning("ZAP scan skipped", error=str(e))
 
         return findings
 
-    def _nuclei_to_finding(self, result: Dict) -> Optional[Dict]:
+    def _nuclei_to_finding(self, result: Dict) -> Optional[Finding]:
         """Convert Nuclei result to finding"""
         try:
             info = result.get("info", {})
-            severity_map = {"critical": "CRITICAL", "high": "HIGH", "medium": "MEDIUM", "low": "LOW", "info": "INFO"}
-
-            return {
-                "id": f"nuclei-{result.get('template-id', uuid.uuid4().hex[:8])}",
-                "engine": "nuclei",
-                "type": result.get("template-id", "Unknown"),
-                "severity": severity_map.get(info.get("severity", "info").lower(), "INFO"),
-                "confidence": "HIGH",
-                "title": info.get("name", result.get("template-id", "Unknown")),
-                "description": info.get("description", ""),
-                "endpoint": result.get("matched-at", "/"),
-                "method": result.get("type", "GET").upper(),
-                "remediation": info.get("remediation"),
-                "cwe_id": f"CWE-{info.get('classification', {}).get('cwe-id', [''])[0]}" if info.get("classification", {}).get("cwe-id") else None,
-                "references": info.get("reference", [])
-            }
-        except Exception:
+            return Finding(
+                id=f"nuclei-{result.get('template-id') or self._next_id()}",
+                engine="nuclei",
+                type=result.get("template-id", "Unknown"),
+                severity=SEVERITY_MAP.get(info.get("severity", "info").lower(), "INFO"),
+                confidence="HIGH",
+                title=info.get("name", result.get("template-id", "Unknown")),
+                description=info.get("description", ""),
+                endpoint=result.get("matched-at", "/"),
+                method=result.get("type", "GET").upper(),
+                remediation=info.get("remediation"),
+                cwe_id=f"CWE-{info.get('classification', {}).get('cwe-id', [''])[0]}" if info.get("classification", {}).get("cwe-id") else None,
+                references=info.get("reference", [])
+            )
+        except (AttributeError, TypeError):
+            # Malformed result, e.g. a null where an object or string is expected
             return None
 
-    def _zap_to_finding(self, alert: Dict) -> Optional[Dict]:
+    def _zap_to_finding(self, alert: Dict) -> Optional[Finding]:
         """Convert ZAP alert to finding"""
         try:
-            risk_map = {"Informational": "INFO", "Low": "LOW", "Medium": "MEDIUM", "High": "HIGH"}
-
-            return {
-                "id": f"zap-{alert.get('alertRef', uuid.uuid4().hex[:8])}",
-                "engine": "zap",
-                "type": alert.get("name", "Unknown"),
-                "severity": risk_map.get(alert.get("risk", ""), "INFO"),
-                "confidence": alert.get("confidence", "MEDIUM"),
-                "title": alert.get("name", "Unknown"),
-                "description": alert.get("description", ""),
-                "endpoint": alert.get("url", "/"),
-                "method": alert.get("method", "GET"),
-                "parameter": alert.get("param"),
-                "evidence": alert.get("evidence"),
-                "remediation": alert.get("solution"),
-                "cwe_id": f"CWE-{alert.get('cweid')}" if alert.get("cweid") else None
-            }
-        except Exception:
+            return Finding(
+                id=f"zap-{alert.get('alertRef') or self._next_id()}",
+                engine="zap",
+                type=alert.get("name", "Unknown"),
+                severity=RISK_MAP.get(alert.get("risk", ""), "INFO"),
+                confidence=alert.get("confidence", "MEDIUM"),
+                title=alert.get("name", "Unknown"),
+                description=alert.get("description", ""),
+                endpoint=alert.get("url", "/"),
+                method=alert.get("method", "GET"),
+                parameter=alert.get("param"),
+                evidence=alert.get("evidence"),
+                remediation=alert.get("solution"),
+                cwe_id=f"CWE-{alert.get('cweid')}" if alert.get("cweid") else None
+            )
+        except (AttributeError, TypeError):
             return None
 
-    def _deduplicate_findings(self, findings: List[Dict]) -> List[Dict]:
-        """Remove duplicate findings"""
-        seen = set()
+    def _finalize(self, findings: List[Finding]) -> tuple:
+        """
+        Deduplicate, enrich and summarise findings in a single pass.
+
+        Returns:
+            (unique findings, summary, risk score, compliance summary)
+        """
+        seen: set = set()
         unique = []
+        # Fixed-shape counts indexed by severity rank instead of a dict keyed by name
+        counts = [0] * len(SEVERITY_ORDER)
+        info = SEVERITY_INDEX["INFO"]
 
-        for finding in findings:
-            key = (finding.get("type"), finding.get("endpoint"), finding.get("method"))
-            if key not in seen:
-                seen.add(key)
-                unique.append(finding)
-
-        return unique
-
-    def _enrich_findings(self, findings: List[Dict]) -> List[Dict]:
-        """Add compliance mappings and remediation"""
-        owasp_mappings = {
-            "sql": "API1:2023 - Broken Object Level Authorization",
-            "xss": "API8:2023 - Security Misconfiguration",
-            "auth": "API2:2023 - Broken Authentication",
-            "ssrf": "API7:2023 - Server Side Request Forgery"
-        }
+        # Hot loop on large ZAP result sets: bind globals and bound methods to locals
+        owasp_category = _owasp_category
+        severity_index = SEVERITY_INDEX.get
+        seen_add = seen.add
+        keep = unique.append
 
         for finding in findings:
-            title_lower = finding.get("title", "").lower()
-            for keyword, owasp in owasp_mappings.items():
-                if keyword in title_lower:
-                    finding["owasp_category"] = owasp
-                    break
+            key = (finding.type, finding.endpoint, finding.method)
+            if key in seen:
+                continue
+            seen_add(key)
+            keep(finding)
 
-        return findings
+            # Compliance mapping
+            owasp = owasp_category(finding.title)
+            if owasp:
+                finding.owasp_category = owasp
 
-    def _calculate_summary(self, findings: List[Dict]) -> Dict[str, Any]:
-        """Calculate summary statistics"""
-        by_severity = {"CRITICAL": 0, "HIGH": 0, "MEDIUM": 0, "LOW": 0, "INFO": 0}
+            counts[severity_index(finding.severity, info)] += 1
 
-        for finding in findings:
-            severity = finding.get("severity", "INFO")
-            by_severity[severity] = by_severity.get(severity, 0) + 1
-
-        return {
-            "total": len(findings),
-            "by_severity": by_severity,
-            "critical_count": by_severity["CRITICAL"],
-            "high_count": by_severity["HIGH"],
-            "actionable": by_severity["CRITICAL"] + by_severity["HIGH"]
-        }
-
-    def _calculate_risk_score(self, findings: List[Dict]) -> int:
-        """Calculate risk score 0-100"""
-        weights = {"CRITICAL": 25, "HIGH": 15, "MEDIUM": 5, "LOW": 2, "INFO": 0}
-        total = sum(weights.get(f.get("severity", "INFO"), 0) for f in findings)
-        return min(100, total)
-
-    def _get_compliance_summary(self, findings: List[Dict]) -> Dict[str, Any]:
-        """Get basic compliance impact summary"""
-        affected_frameworks = set()
-
-        for finding in findings:
-            if finding.get("severity") in ["CRITICAL", "HIGH"]:
-                affected_frameworks.update(["soc2", "pci_dss", "hipaa", "gdpr"])
-            elif finding.get("severity") == "MEDIUM":
-                affected_frameworks.update(["soc2", "pci_dss"])
-
-        return {
-            "frameworks_affected": list(affected_frameworks),
-            "total_controls_affected": len(affected_frameworks) * 3  # Estimate
-        }
+        summary, risk_score, compliance_summary = summarize(dict(zip(SEVERITY_ORDER, counts)))
+        return unique, summary, risk_score, compliance_summary
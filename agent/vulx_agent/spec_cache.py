@@ -0,0 +1,135 @@
+"""
+VULX Spec Cache
+===============
+On-disk cache for remote OpenAPI specifications.
+
+CI pipelines run the agent repeatedly against the same, mostly stable spec.
+Remote specs are parsed once and stored as canonical JSON under
+``$XDG_CACHE_HOME/vulx/specs`` (default ``~/.cache/vulx/specs``). Every run
+revalidates the cached copy with ``If-None-Match``/``If-Modified-Since``, so
+a freshly deployed spec is picked up immediately and an unchanged one costs
+a 304 instead of a download and parse.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+
+import httpx
+import orjson
+import structlog
+import yaml
+
+logger = structlog.get_logger()
+
+try:
+    _YamlLoader = yaml.CSafeLoader
+except AttributeError:
+    _YamlLoader = yaml.SafeLoader
+
+
+def cache_dir() -> Path:
+    """Directory holding cached specs"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return Path(base) / "vulx" / "specs"
+
+
+def _parse_spec(content: bytes, content_type: str) -> object:
+    """Parse a JSON or YAML spec body"""
+    if "json" in content_type:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+    # JSON is valid YAML, so this also covers mislabelled JSON
+    return yaml.load(content, Loader=_YamlLoader)
+
+
+def _check_openapi(document: object):
+    """Reject bodies that parsed but are not an OpenAPI/Swagger document (e.g. HTML error pages)"""
+    if not isinstance(document, dict) or not ("openapi" in document or "swagger" in document):
+        raise ValueError("response is not an OpenAPI document")
+
+
+def _has_external_refs(document: object) -> bool:
+    """True if any $ref points outside the document (relative files, URLs)"""
+    stack = [document]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str) and not ref.startswith("#"):
+                return True
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return False
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+async def resolve_spec(spec: Optional[str]) -> Optional[str]:
+    """
+    Return a local path to a cached copy of a remote spec.
+
+    Local paths, specs with external ``$ref``s (which must keep resolving
+    against the URL), and anything that cannot be fetched or parsed with no
+    cached copy to fall back on are returned unchanged.
+    """
+    if not spec or not spec.startswith(("http://", "https://")):
+        return spec
+
+    directory = cache_dir()
+    key = hashlib.sha256(spec.encode()).hexdigest()
+    spec_path = directory / f"{key}.json"
+    meta_path = directory / f"{key}.meta.json"
+
+    cached = spec_path.exists()
+    headers = {}
+    if cached and meta_path.exists():
+        try:
+            meta = orjson.loads(meta_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            meta = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+            response = await client.get(spec, headers=headers)
+
+        if response.status_code == 304 and cached:
+            logger.debug("Cached spec still current", spec=spec)
+            return str(spec_path)
+
+        response.raise_for_status()
+        document = _parse_spec(response.content, response.headers.get("content-type", ""))
+        _check_openapi(document)
+
+        if _has_external_refs(document):
+            logger.debug("Spec has external $refs, not caching", spec=spec)
+            return spec
+
+        directory.mkdir(parents=True, exist_ok=True)
+        _write_atomic(spec_path, orjson.dumps(document, option=orjson.OPT_NON_STR_KEYS))
+        _write_atomic(meta_path, orjson.dumps({
+            "url": spec,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified")
+        }))
+        logger.debug("Cached spec", spec=spec, path=str(spec_path))
+        return str(spec_path)
+
+    except (httpx.HTTPError, yaml.YAMLError, orjson.JSONEncodeError, OSError, ValueError) as e:
+        if cached:
+            logger.warning("Spec refresh failed, using stale cache", spec=spec, error=str(e))
+            return str(spec_path)
+        logger.warning("Spec caching failed, using spec URL directly", spec=spec, error=str(e))
+        return spec
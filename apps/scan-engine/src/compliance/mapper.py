@@ -13,7 +13,10 @@ Supported Frameworks:
 - CIS Controls v8
 """
 
-from typing import Dict, List, Any, Optional
+import functools
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -29,7 +32,7 @@ class ComplianceFramework(Enum):
     CIS_CONTROLS = "cis_controls"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ComplianceControl:
     """A compliance framework control"""
     framework: str
@@ -40,7 +43,7 @@ class ComplianceControl:
     requirement_level: str  # required, recommended, optional
 
 
-@dataclass
+@dataclass(slots=True)
 class ComplianceMapping:
     """Mapping of a finding to compliance controls"""
     finding_type: str
@@ -49,6 +52,57 @@ class ComplianceMapping:
     controls: Dict[str, List[ComplianceControl]] = field(default_factory=dict)
 
 
+def _cwe_number(cwe_id: str) -> Optional[int]:
+    """Numeric part of a CWE ID ("CWE-89" or "89"), or None if it has none"""
+    try:
+        return int(cwe_id.removeprefix("CWE-"))
+    except ValueError:
+        return None
+
+
+def _owasp_key(owasp_category: str) -> str:
+    """Strip the descriptive suffix from an OWASP category"""
+    return owasp_category.partition(" - ")[0]
+
+
+@functools.lru_cache(maxsize=4096)
+def _fuse(cwe_number: Optional[int], owasp_id: Optional[str], enabled_values: frozenset) -> Dict[str, Tuple[str, ...]]:
+    """
+    Merge the CWE and OWASP mappings of a normalised pair into one
+    framework -> sorted controls index.
+
+    Cached across instances; the enabled frameworks are part of the key.
+    Callers must not mutate the returned dict.
+    """
+    mappings: Dict[str, set] = {}
+
+    # Map by CWE ID; filter frameworks with a C-level key-view intersection
+    cwe_mappings = ComplianceMapper._CWE_INT_MAPPINGS.get(cwe_number)
+    if cwe_mappings:
+        for framework in cwe_mappings.keys() & enabled_values:
+            mappings[framework] = set(cwe_mappings[framework])
+
+    # Map by OWASP category, merging into the CWE sets where both apply
+    owasp_mappings = ComplianceMapper.OWASP_MAPPINGS.get(owasp_id)
+    if owasp_mappings:
+        for framework in owasp_mappings.keys() & enabled_values:
+            if framework in mappings:
+                mappings[framework] |= owasp_mappings[framework]
+            else:
+                mappings[framework] = set(owasp_mappings[framework])
+
+    return {framework: tuple(sorted(controls)) for framework, controls in mappings.items()}
+
+
+def _pair_mappings(cwe_id: Optional[str], owasp_category: Optional[str], enabled_values: frozenset) -> Dict[str, Tuple[str, ...]]:
+    """Controls per enabled framework for a raw (CWE, OWASP category) pair"""
+    return _fuse(
+        _cwe_number(cwe_id) if cwe_id else None,
+        _owasp_key(owasp_category) if owasp_category else None,
+        enabled_values
+    )
+
+
 class ComplianceMapper:
     """
     Maps security findings to compliance framework controls.
@@ -60,6 +114,17 @@ class ComplianceMapper:
     - GDPR compliance checks
     """
 
+    # Human-readable framework names
+    _FRAMEWORK_NAMES = {
+        ComplianceFramework.SOC2: "SOC 2 Type II",
+        ComplianceFramework.PCI_DSS: "PCI-DSS v4.0",
+        ComplianceFramework.HIPAA: "HIPAA Security Rule",
+        ComplianceFramework.GDPR: "GDPR",
+        ComplianceFramework.ISO_27001: "ISO 27001:2022",
+        ComplianceFramework.NIST_CSF: "NIST Cybersecurity Framework",
+        ComplianceFramework.CIS_CONTROLS: "CIS Controls v8"
+    }
+
     # CWE to Compliance Control Mappings
     CWE_MAPPINGS = {
         # SQL Injection
@@ -364,12 +429,18 @@ class ComplianceMapper:
 
     def __init__(self):
         self.enabled_frameworks = list(ComplianceFramework)
+        self._enabled_values = frozenset(f.value for f in ComplianceFramework)
 
     def set_enabled_frameworks(self, frameworks: List[ComplianceFramework]):
         """Set which compliance frameworks to include in mappings"""
         self.enabled_frameworks = frameworks
+        self._enabled_values = frozenset(f.value for f in frameworks)
 
-    def map_finding(self, finding: Any) -> Dict[str, List[str]]:
+    def invalidate_cache(self):
+        """Drop all cached mappings"""
+        _fuse.cache_clear()
+
+    def map_finding(self, finding: Any) -> Dict[str, Tuple[str, ...]]:
         """
         Map a security finding to compliance controls.
 
@@ -377,43 +448,25 @@ class ComplianceMapper:
             finding: Finding object with cwe_id and owasp_category
 
         Returns:
-            Dict mapping framework names to list of control IDs
+            Dict mapping framework names to a sorted tuple of control IDs
         """
-        mappings: Dict[str, List[str]] = {}
-
-        # Map by CWE ID
-        if finding.cwe_id:
-            cwe_clean = finding.cwe_id.replace("CWE-", "")
-            cwe_key = f"CWE-{cwe_clean}"
+        # The tuples are immutable, so only the dict needs copying
+        return dict(_pair_mappings(finding.cwe_id, finding.owasp_category, self._enabled_values))
 
-            if cwe_key in self.CWE_MAPPINGS:
-                for framework, controls in self.CWE_MAPPINGS[cwe_key].items():
-                    if any(f.value == framework for f in self.enabled_frameworks):
-                        if framework not in mappings:
-                            mappings[framework] = []
-                        mappings[framework].extend(controls)
-
-        # Map by OWASP category
-        if finding.owasp_category:
-            owasp_id = finding.owasp_category.split(" - ")[0] if " - " in finding.owasp_category else finding.owasp_category
-
-            if owasp_id in self.OWASP_MAPPINGS:
-                for framework, controls in self.OWASP_MAPPINGS[owasp_id].items():
-                    if any(f.value == framework for f in self.enabled_frameworks):
-                        if framework not in mappings:
-                            mappings[framework] = []
-                        mappings[framework].extend(controls)
-
-        # Deduplicate
-        for framework in mappings:
-            mappings[framework] = list(set(mappings[framework]))
+    def map_findings(self, findings: Iterable[Any]) -> Iterator[Dict[str, Tuple[str, ...]]]:
+        """
+        Map findings in bulk, yielding one framework -> controls dict per finding.
 
-        return mappings
+        The yielded dicts are shared cache entries and must not be mutated;
+        use map_finding for a private copy.
+        """
+        enabled_values = self._enabled_values
+        for finding in findings:
+            yield _pair_mappings(finding.cwe_id, finding.owasp_category, enabled_values)
 
     def get_control_details(self, framework: str, control_id: str) -> Optional[ComplianceControl]:
         """Get detailed information about a compliance control"""
-        framework_controls = self.CONTROL_DETAILS.get(framework, {})
-        return framework_controls.get(control_id)
+        return self._FLAT_CONTROL_DETAILS.get((framework, control_id))
 
     def get_summary(self, findings: List[Any]) -> Dict[str, Any]:
         """
@@ -427,17 +480,15 @@ class ComplianceMapper:
             "controls_by_framework": {}
         }
 
-        all_controls: Dict[str, set] = {}
-
-        for finding in findings:
-            mappings = self.map_finding(finding)
+        all_controls: Dict[str, set] = defaultdict(set)
+        for mappings in self.map_findings(findings):
             for framework, controls in mappings.items():
-                if framework not in all_controls:
-                    all_controls[framework] = set()
                 all_controls[framework].update(controls)
 
+        total = 0
         for framework, controls in all_controls.items():
-            control_list = sorted(list(controls))
+            control_list = sorted(controls)
+            total += len(control_list)
             summary["controls_by_framework"][framework] = control_list
             summary["frameworks"][framework] = {
                 "controls_affected": len(control_list),
@@ -445,9 +496,7 @@ class ComplianceMapper:
                 "status": "REQUIRES_ATTENTION" if control_list else "COMPLIANT"
             }
 
-        summary["total_controls_affected"] = sum(
-            len(controls) for controls in all_controls.values()
-        )
+        summary["total_controls_affected"] = total
 
         return summary
 
@@ -458,21 +507,23 @@ class ComplianceMapper:
         Suitable for auditor review.
         """
         framework_key = framework.value
-        affected_controls: Dict[str, List[Any]] = {}
-
-        for finding in findings:
-            mappings = self.map_finding(finding)
-            if framework_key in mappings:
-                for control_id in mappings[framework_key]:
-                    if control_id not in affected_controls:
-                        affected_controls[control_id] = []
-                    affected_controls[control_id].append({
-                        "finding_id": finding.id,
-                        "type": finding.type,
-                        "severity": finding.severity,
-                        "endpoint": finding.endpoint,
-                        "description": finding.description
-                    })
+        affected_controls: Dict[str, List[Any]] = defaultdict(list)
+
+        for finding, mappings in zip(findings, self.map_findings(findings)):
+            controls = mappings.get(framework_key)
+            if not controls:
+                continue
+
+            # One entry per finding, shared by every control it affects
+            finding_entry = {
+                "finding_id": finding.id,
+                "type": finding.type,
+                "severity": finding.severity,
+                "endpoint": finding.endpoint,
+                "description": finding.description
+            }
+            for control_id in controls:
+                affected_controls[control_id].append(finding_entry)
 
         report = {
             "framework": framework.value,
@@ -500,13 +551,40 @@ class ComplianceMapper:
 
     def _get_framework_name(self, framework: ComplianceFramework) -> str:
         """Get human-readable framework name"""
-        names = {
-            ComplianceFramework.SOC2: "SOC 2 Type II",
-            ComplianceFramework.PCI_DSS: "PCI-DSS v4.0",
-            ComplianceFramework.HIPAA: "HIPAA Security Rule",
-            ComplianceFramework.GDPR: "GDPR",
-            ComplianceFramework.ISO_27001: "ISO 27001:2022",
-            ComplianceFramework.NIST_CSF: "NIST Cybersecurity Framework",
-            ComplianceFramework.CIS_CONTROLS: "CIS Controls v8"
-        }
-        return names.get(framework, framework.value)
+        return self._FRAMEWORK_NAMES.get(framework, framework.value)
+
+
+def _compact_mappings(mappings: Dict[str, Dict[str, List[str]]], shared: Dict[frozenset, frozenset]) -> Dict[str, Dict[str, frozenset]]:
+    """
+    Convert control lists to frozensets of interned control IDs.
+
+    Control lists are only ever unioned, so sets fit better than lists with
+    spare capacity. Identical control sets become one shared object, and
+    interned IDs let set and dict operations compare by identity.
+    """
+    compacted = {}
+    for key, frameworks in mappings.items():
+        compacted[key] = {}
+        for framework, controls in frameworks.items():
+            controls = frozenset(map(sys.intern, controls))
+            compacted[key][framework] = shared.setdefault(controls, controls)
+    return compacted
+
+
+_shared_controls: Dict[frozenset, frozenset] = {}
+ComplianceMapper.CWE_MAPPINGS = _compact_mappings(ComplianceMapper.CWE_MAPPINGS, _shared_controls)
+ComplianceMapper.OWASP_MAPPINGS = _compact_mappings(ComplianceMapper.OWASP_MAPPINGS, _shared_controls)
+del _shared_controls
+
+# CWE mappings keyed by CWE number, so lookups hash an int rather than a string
+ComplianceMapper._CWE_INT_MAPPINGS = {
+    int(cwe.removeprefix("CWE-")): frameworks
+    for cwe, frameworks in ComplianceMapper.CWE_MAPPINGS.items()
+}
+
+# Control details keyed by (framework, control_id) for single-lookup access
+ComplianceMapper._FLAT_CONTROL_DETAILS = {
+    (framework, sys.intern(control_id)): control
+    for framework, controls in ComplianceMapper.CONTROL_DETAILS.items()
+    for control_id, control in controls.items()
+}
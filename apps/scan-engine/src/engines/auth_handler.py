@@ -20,14 +20,21 @@ import time
 import hashlib
 import hmac
 from datetime import datetime
-from typing import Optional, Dict, Any, List
-from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Callable, Awaitable, Tuple
+from dataclasses import dataclass, field, asdict
 from enum import Enum
+from http.cookies import CookieError, SimpleCookie
 import aiohttp
 import urllib.parse
 
 logger = logging.getLogger(__name__)
 
+# Background refresh runs this many seconds ahead of the expiry buffer
+REFRESH_LEAD = 30
+
+# Recorded requests with these methods may replay alongside their neighbours
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
 
 class AuthMethod(Enum):
     """Supported authentication methods"""
@@ -43,7 +50,16 @@ class AuthMethod(Enum):
     AWS_SIGNATURE_V4 = "aws_signature_v4"
 
 
-@dataclass
+# Only these flows return a context with a known expiry. Other contexts are
+# cheap to rebuild or, like session cookies, can be expired by the server at
+# any time, so they are built fresh on every call.
+CACHED_METHODS = frozenset({AuthMethod.OAUTH2_CLIENT_CREDENTIALS, AuthMethod.OAUTH2_PASSWORD})
+
+# Cached contexts kept per handler; the oldest is evicted first
+TOKEN_CACHE_SIZE = 64
+
+
+@dataclass(slots=True)
 class AuthConfig:
     """Authentication configuration"""
     method: AuthMethod = AuthMethod.NONE
@@ -88,7 +104,7 @@ class AuthConfig:
     token_expiry_buffer: int = 60  # seconds before expiry to refresh
 
 
-@dataclass
+@dataclass(slots=True)
 class AuthContext:
     """Authentication context passed to scan engines"""
     method: str
@@ -98,14 +114,14 @@ class AuthContext:
     cookies: Dict[str, str] = field(default_factory=dict)
     headers: Dict[str, str] = field(default_factory=dict)
     query_params: Dict[str, str] = field(default_factory=dict)
-    expires_at: Optional[float] = None
+    expires_at: Optional[float] = None  # time.monotonic() deadline
     refresh_token: Optional[str] = None
 
-    def is_expired(self) -> bool:
-        """Check if token is expired or about to expire"""
+    def is_expired(self, buffer: int = 60) -> bool:
+        """Check if token is expired or expires within ``buffer`` seconds"""
         if self.expires_at is None:
             return False
-        return time.time() >= self.expires_at - 60  # 60 second buffer
+        return time.monotonic() >= self.expires_at - buffer
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -118,6 +134,76 @@ class AuthContext:
         }
 
 
+_connector: Optional[aiohttp.TCPConnector] = None
+# Loop the connector was created in; a connector cannot be used from another loop
+_connector_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _shared_connector() -> aiohttp.TCPConnector:
+    """Connection pool shared by every auth flow in the process"""
+    global _connector, _connector_loop
+    loop = asyncio.get_running_loop()
+    if _connector is None or _connector.closed or _connector_loop is not loop:
+        _connector_loop = loop
+        _connector = aiohttp.TCPConnector(
+            limit=200,
+            limit_per_host=32,
+            ttl_dns_cache=300,
+            keepalive_timeout=75
+        )
+    return _connector
+
+
+def _new_session() -> aiohttp.ClientSession:
+    """
+    Session on the shared connection pool.
+
+    Each flow keeps its own cookie jar, so logins for different targets
+    cannot leak cookies into one another, while keep-alive connections and
+    DNS lookups are reused across all of them.
+    """
+    return aiohttp.ClientSession(
+        connector=_shared_connector(),
+        connector_owner=False,
+        timeout=aiohttp.ClientTimeout(total=30)
+    )
+
+
+async def close_shared_connector():
+    """Close the shared connection pool; call once on shutdown"""
+    global _connector, _connector_loop
+    if _connector is not None:
+        await _connector.close()
+        _connector = None
+        _connector_loop = None
+
+
+def _parse_set_cookie(headers: List[str]) -> Dict[str, str]:
+    """Cookie values from Set-Cookie headers, parsed per RFC 6265"""
+    parsed = SimpleCookie()
+    for header in headers:
+        try:
+            parsed.load(header)
+        except CookieError as e:
+            logger.debug(f"Ignoring malformed Set-Cookie header: {e}")
+    return {name: morsel.value for name, morsel in parsed.items()}
+
+
+def _truncate_utf8(text: str, limit: int) -> str:
+    """Cut text to at most limit UTF-8 bytes without splitting a character"""
+    # Every character takes at least one byte, so the first limit characters cover the cut
+    encoded = text[:limit].encode()
+    if len(encoded) <= limit:
+        return text[:limit]
+    return encoded[:limit].decode(errors="ignore")
+
+
+def _fingerprint(config: AuthConfig) -> str:
+    """Stable hash of an auth configuration, used as the token cache key"""
+    canonical = json.dumps(asdict(config), sort_keys=True, default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
 class AuthHandler:
     """
     Handles authentication for security scanning.
@@ -127,18 +213,37 @@ class AuthHandler:
     - Token refresh
     - Session management
     - Custom authentication flows
+
+    OAuth2 contexts are cached per configuration, so repeated scans with the
+    same credentials reuse a token. Expiring tokens are renewed by a background
+    task before they are needed, keeping the refresh off the scan path.
     """
 
     def __init__(self):
         self.session: Optional[aiohttp.ClientSession] = None
-        self._token_cache: Dict[str, AuthContext] = {}
+        self._token_cache: Dict[str, Tuple[AuthContext, AuthConfig]] = {}
+        # Token requests in flight, shared by concurrent callers
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._refresher: Optional[asyncio.Task] = None
+        # Created with the refresher, inside the loop that runs it
+        self._cache_changed: Optional[asyncio.Event] = None
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create HTTP session"""
         if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            self.session = _new_session()
         return self.session
 
+    async def _coalesce(self, key: str, coro_factory: Callable[[], Awaitable[AuthContext]]) -> AuthContext:
+        """Run coro_factory once per key, with concurrent callers awaiting the same task"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(coro_factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one cancelled caller does not cancel the request for the rest
+        return await asyncio.shield(task)
+
     async def authenticate(self, config: AuthConfig) -> AuthContext:
         """
         Perform authentication and return context.
@@ -149,6 +254,80 @@ class AuthHandler:
         Returns:
             AuthContext with credentials for scanning
         """
+        if config.method not in CACHED_METHODS:
+            return await self._authenticate(config)
+
+        if self._refresher is None or self._refresher.done():
+            self._cache_changed = asyncio.Event()
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+        fingerprint = _fingerprint(config)
+        cached = self._token_cache.get(fingerprint)
+        if cached is not None and not cached[0].is_expired(config.token_expiry_buffer):
+            logger.debug(f"Reusing cached auth context for method: {config.method.value}")
+            return cached[0]
+
+        # Identical configs share one request, so a burst of scans hits the IdP once
+        return await self._coalesce(fingerprint, lambda: self._authenticate_and_cache(fingerprint, config))
+
+    async def _authenticate_and_cache(self, fingerprint: str, config: AuthConfig) -> AuthContext:
+        context = await self._authenticate(config)
+        self._store(fingerprint, context, config)
+        return context
+
+    def _store(self, fingerprint: str, context: AuthContext, config: AuthConfig):
+        if fingerprint not in self._token_cache and len(self._token_cache) >= TOKEN_CACHE_SIZE:
+            del self._token_cache[next(iter(self._token_cache))]
+        self._token_cache[fingerprint] = (context, config)
+        if self._cache_changed is not None:
+            self._cache_changed.set()
+
+    async def _refresh_loop(self):
+        """Renew cached tokens shortly before they enter their expiry buffer"""
+        while True:
+            self._cache_changed.clear()
+            due = [
+                (context.expires_at - config.token_expiry_buffer - REFRESH_LEAD, fingerprint)
+                for fingerprint, (context, config) in self._token_cache.items()
+                if context.expires_at is not None
+            ]
+            if not due:
+                await self._cache_changed.wait()
+                continue
+
+            deadline, fingerprint = min(due)
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._cache_changed.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            context, config = self._token_cache[fingerprint]
+            try:
+                await self._coalesce(fingerprint, lambda: self._renew(fingerprint, context, config))
+            except Exception as e:
+                logger.warning(f"Background token refresh failed: {e}")
+                self._token_cache.pop(fingerprint, None)
+
+    async def _renew(self, fingerprint: str, context: AuthContext, config: AuthConfig) -> AuthContext:
+        """Refresh a cached token, re-authenticating when it cannot be refreshed"""
+        if context.refresh_token and config.token_refresh_url:
+            renewed = await self._request_refresh(context, config)
+        else:
+            renewed = await self._authenticate(config)
+
+        if renewed.expires_at is not None and renewed.expires_at - config.token_expiry_buffer - REFRESH_LEAD <= time.monotonic():
+            # Lifetime shorter than the refresh window; leave it to inline authentication
+            logger.debug(f"Token too short-lived for background refresh: {config.method.value}")
+            self._token_cache.pop(fingerprint, None)
+        else:
+            self._store(fingerprint, renewed, config)
+        return renewed
+
+    async def _authenticate(self, config: AuthConfig) -> AuthContext:
+        """Build a fresh context for the configured method"""
         logger.info(f"Authenticating using method: {config.method.value}")
 
         if config.method == AuthMethod.NONE:
@@ -251,7 +430,7 @@ class AuthHandler:
                     method="oauth2_client_credentials",
                     bearer_token=access_token,
                     headers={"Authorization": f"Bearer {access_token}"},
-                    expires_at=time.time() + expires_in,
+                    expires_at=time.monotonic() + expires_in,
                     refresh_token=refresh_token
                 )
 
@@ -289,7 +468,7 @@ class AuthHandler:
                     method="oauth2_password",
                     bearer_token=token_data["access_token"],
                     headers={"Authorization": f"Bearer {token_data['access_token']}"},
-                    expires_at=time.time() + token_data.get("expires_in", 3600),
+                    expires_at=time.monotonic() + token_data.get("expires_in", 3600),
                     refresh_token=token_data.get("refresh_token")
                 )
 
@@ -319,19 +498,12 @@ class AuthHandler:
                     raise ValueError(f"Login failed with status {response.status}")
 
                 # Extract cookies
-                cookies = {}
-                for cookie in session.cookie_jar:
-                    cookies[cookie.key] = cookie.value
+                cookies = {cookie.key: cookie.value for cookie in session.cookie_jar}
 
                 # Check for specific session cookie
                 if config.session_cookie_name and config.session_cookie_name not in cookies:
                     # Try to find it in response headers
-                    for cookie_header in response.headers.getall("Set-Cookie", []):
-                        if config.session_cookie_name in cookie_header:
-                            # Parse cookie value
-                            parts = cookie_header.split(";")[0].split("=")
-                            if len(parts) >= 2:
-                                cookies[parts[0].strip()] = parts[1].strip()
+                    cookies.update(_parse_set_cookie(response.headers.getall("Set-Cookie", [])))
 
                 # Handle CSRF token if needed
                 headers = {}
@@ -375,10 +547,18 @@ class AuthHandler:
         )
 
     async def refresh_token(self, context: AuthContext, config: AuthConfig) -> AuthContext:
-        """Refresh an expired token"""
+        """Refresh an expired token; a token that is still valid is returned as is"""
+        if context.expires_at and not context.is_expired(config.token_expiry_buffer):
+            return context
+
         if not context.refresh_token or not config.token_refresh_url:
             raise ValueError("No refresh token or refresh URL available")
 
+        key = f"refresh|{config.token_refresh_url}|{config.oauth2_client_id}|{context.refresh_token}"
+        return await self._coalesce(key, lambda: self._request_refresh(context, config))
+
+    async def _request_refresh(self, context: AuthContext, config: AuthConfig) -> AuthContext:
+        """POST the refresh grant"""
         session = await self._get_session()
 
         data = {
@@ -400,12 +580,19 @@ class AuthHandler:
                 method=context.method,
                 bearer_token=token_data["access_token"],
                 headers={"Authorization": f"Bearer {token_data['access_token']}"},
-                expires_at=time.time() + token_data.get("expires_in", 3600),
+                expires_at=time.monotonic() + token_data.get("expires_in", 3600),
                 refresh_token=token_data.get("refresh_token", context.refresh_token)
             )
 
     async def close(self):
         """Cleanup resources"""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
         if self.session:
             await self.session.close()
 
@@ -415,12 +602,21 @@ class AuthRecorder:
     Records authentication flows for replay.
 
     Used to capture complex auth flows that can be replayed during scanning.
+    Memory is bounded: recording more than ``max_entries`` requests raises
+    ValueError, since dropping the earliest ones (usually the login) would
+    leave a flow that cannot be replayed. Response bodies are truncated to
+    ``max_body_bytes`` UTF-8 bytes; request bodies are kept whole since they
+    are replayed.
     """
 
-    def __init__(self):
+    def __init__(self, max_entries: int = 1000, max_body_bytes: int = 65536):
+        self.max_entries = max_entries
+        self.max_body_bytes = max_body_bytes
         self.recorded_requests: List[Dict] = []
         self.recorded_cookies: Dict[str, str] = {}
         self.recorded_headers: Dict[str, str] = {}
+        # Whether the last recorded request must finish before the next one starts
+        self._last_is_barrier = False
 
     def record_request(
         self,
@@ -430,28 +626,47 @@ class AuthRecorder:
         body: Optional[str] = None,
         response_status: int = 200,
         response_headers: Dict[str, str] = None,
-        response_body: Optional[str] = None
+        response_body: Optional[str] = None,
+        depends_on_previous: Optional[bool] = None
     ):
-        """Record an authentication request"""
+        """
+        Record an authentication request.
+
+        A request depends on the previous one when either of them is not a
+        safe (GET/HEAD/OPTIONS) request, or when the previous response set
+        cookies; pass depends_on_previous to override.
+
+        Raises:
+            ValueError: If max_entries requests have already been recorded
+        """
+        if len(self.recorded_requests) >= self.max_entries:
+            raise ValueError(f"Auth flow exceeds {self.max_entries} recorded requests")
+
+        set_cookies = [
+            value for key, value in (response_headers or {}).items() if key.lower() == "set-cookie"
+        ]
+        unsafe = method.upper() not in SAFE_METHODS
+        if depends_on_previous is None:
+            depends_on_previous = self._last_is_barrier or unsafe
+        # Later reads must observe this write, or use these cookies
+        self._last_is_barrier = unsafe or bool(set_cookies)
+
         self.recorded_requests.append({
             "method": method,
             "url": url,
             "headers": headers,
             "body": body,
+            "depends_on_previous": depends_on_previous,
             "response": {
                 "status": response_status,
                 "headers": response_headers or {},
-                "body": response_body
+                "body": _truncate_utf8(response_body, self.max_body_bytes) if response_body else response_body
             }
         })
 
         # Extract cookies from response
-        if response_headers:
-            for key, value in response_headers.items():
-                if key.lower() == "set-cookie":
-                    cookie_parts = value.split(";")[0].split("=")
-                    if len(cookie_parts) >= 2:
-                        self.recorded_cookies[cookie_parts[0].strip()] = cookie_parts[1].strip()
+        if set_cookies:
+            self.recorded_cookies.update(_parse_set_cookie(set_cookies))
 
     def export_config(self) -> Dict[str, Any]:
         """Export recorded auth flow as config"""
@@ -462,18 +677,35 @@ class AuthRecorder:
         }
 
     async def replay(self) -> AuthContext:
-        """Replay recorded auth flow"""
-        async with aiohttp.ClientSession() as session:
-            for request in self.recorded_requests:
+        """
+        Replay recorded auth flow.
+
+        Consecutive independent requests are sent concurrently; a request
+        that depends on the previous one waits for everything before it.
+        """
+        # Entries without the flag (older exports) replay sequentially
+        groups: List[List[Dict]] = []
+        for request in self.recorded_requests:
+            if not groups or request.get("depends_on_previous", True):
+                groups.append([request])
+            else:
+                groups[-1].append(request)
+
+        async with _new_session() as session:
+            async def send(request: Dict):
                 async with session.request(
                     request["method"],
                     request["url"],
                     headers=request["headers"],
                     data=request.get("body")
-                ) as response:
-                    # Update cookies from response
-                    for cookie in session.cookie_jar:
-                        self.recorded_cookies[cookie.key] = cookie.value
+                ):
+                    pass
+
+            for group in groups:
+                await asyncio.gather(*(send(request) for request in group))
+
+            # Collect the cookies set across the whole flow
+            self.recorded_cookies.update({cookie.key: cookie.value for cookie in session.cookie_jar})
 
             return AuthContext(
                 method="recorded_flow",
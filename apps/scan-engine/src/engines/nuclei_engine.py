@@ -12,17 +12,69 @@ Features:
 """
 
 import asyncio
+import functools
+import hashlib
+import itertools
 import logging
-import json
+import re
+import shutil
+import tempfile
 import subprocess
 import os
-import tempfile
 import uuid
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
 from dataclasses import dataclass
+from urllib.parse import urlparse as _urlparse_raw
+import yaml
+
+try:
+    import orjson as _json
+except ImportError:  # stdlib fallback; orjson parses Nuclei output several times faster
+    import json as _json
 
 logger = logging.getLogger(__name__)
 
+# Findings cluster on a handful of URLs, so parse each one once
+_urlparse = functools.lru_cache(maxsize=4096)(_urlparse_raw)
+
+_CVE_RE = re.compile(r"CVE-", re.IGNORECASE)
+
+# Specialty scans run pre-resolved workflow files cached here, outside the
+# template tree so regular -templates scans never pick them up
+WORKFLOWS_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "vulx", "nuclei-workflows"
+)
+
+# Files Nuclei rewrites on a template update; their stats key the workflow cache
+_TEMPLATE_MARKERS = ("TEMPLATES-STATS.json", ".version")
+
+# Nuclei JSONL lines carry full request/response bodies; raise the 64 KiB default
+STREAM_LIMIT = 16 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=1)
+def _check_nuclei_once() -> bool:
+    """Verify Nuclei is installed (once per process)"""
+    if shutil.which("nuclei") is None:
+        logger.warning("Nuclei binary not found in PATH")
+        return False
+    try:
+        result = subprocess.run(
+            ["nuclei", "-version"],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        if result.returncode == 0:
+            logger.info(f"Nuclei found: {result.stdout.strip()}")
+            return True
+        logger.warning("Nuclei not found or error in version check")
+    except FileNotFoundError:
+        logger.warning("Nuclei binary not found in PATH")
+    except Exception as e:
+        logger.warning(f"Error checking Nuclei: {e}")
+    return False
+
 
 @dataclass
 class NucleiConfig:
@@ -84,6 +136,11 @@ class NucleiEngine:
         "rate-limit": "API4:2023 - Unrestricted Resource Consumption",
     }
 
+    # All OWASP_MAP keys in one pass: the lookahead reports a key at every
+    # position, and the earliest key in OWASP_MAP order wins
+    _OWASP_KEYWORD_RE = re.compile("(?=(" + "|".join(map(re.escape, OWASP_MAP)) + "))")
+    _OWASP_PRIORITY = {key: rank for rank, key in enumerate(OWASP_MAP)}
+
     # API-specific templates to prioritize
     API_TEMPLATES = [
         "http/vulnerabilities/",
@@ -98,32 +155,15 @@ class NucleiEngine:
 
     def __init__(self, templates_path: str = "/opt/nuclei-templates"):
         self.config = NucleiConfig(templates_path=templates_path)
-        self._check_nuclei_installed()
-
-    def _check_nuclei_installed(self):
-        """Verify Nuclei is installed"""
-        try:
-            result = subprocess.run(
-                ["nuclei", "-version"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if result.returncode == 0:
-                logger.info(f"Nuclei found: {result.stdout.strip()}")
-            else:
-                logger.warning("Nuclei not found or error in version check")
-        except FileNotFoundError:
-            logger.warning("Nuclei binary not found in PATH")
-        except Exception as e:
-            logger.warning(f"Error checking Nuclei: {e}")
+        _check_nuclei_once()
 
     async def scan(
         self,
         target: Any,  # ScanTarget
         auth_context: Optional[Dict] = None,
         severity_filter: Optional[List[str]] = None,
-        template_tags: Optional[List[str]] = None
+        template_tags: Optional[List[str]] = None,
+        workflow: Optional[str] = None
     ) -> List[Any]:  # List[Finding]
         """
         Execute Nuclei scan against target.
@@ -133,39 +173,53 @@ class NucleiEngine:
             auth_context: Authentication context
             severity_filter: Filter by severity levels
             template_tags: Specific template tags to use
+            workflow: Workflow file naming the exact templates to run
 
         Returns:
             List of Finding objects
         """
-        from .orchestrator import Finding
-
         findings = []
-        severity_filter = severity_filter or self.config.severity_filter
 
-        try:
-            # Create temporary file for results
-            with tempfile.NamedTemporaryFile(
-                mode='w',
-                suffix='.json',
-                delete=False
-            ) as results_file:
-                results_path = results_file.name
-
-            # Build Nuclei command
-            cmd = [
-                "nuclei",
-                "-target", target.url,
-                "-json-export", results_path,
-                "-rate-limit", str(self.config.rate_limit),
-                "-bulk-size", str(self.config.bulk_size),
-                "-concurrency", str(self.config.concurrency),
-                "-timeout", str(self.config.timeout),
-                "-retries", str(self.config.retries),
-                "-severity", ",".join(severity_filter),
-                "-silent",
-                "-no-color"
-            ]
+        def collect(result: Dict):
+            finding = self._result_to_finding(result)
+            if finding:
+                findings.append(finding)
+
+        logger.info(f"Running Nuclei scan on {target.url}")
+        await self._run(target.url, auth_context, severity_filter, template_tags, workflow, collect)
+        logger.info(f"Nuclei scan found {len(findings)} issues")
+
+        return findings
 
+    def _build_command(
+        self,
+        target_url: str,
+        auth_context: Optional[Dict],
+        severity_filter: Optional[List[str]],
+        template_tags: Optional[List[str]],
+        workflow: Optional[str] = None
+    ) -> List[str]:
+        """Nuclei command line; results stream to stdout as JSON lines"""
+        severity_filter = severity_filter or self.config.severity_filter
+
+        cmd = [
+            "nuclei",
+            "-target", target_url,
+            "-jsonl",
+            "-rate-limit", str(self.config.rate_limit),
+            "-bulk-size", str(self.config.bulk_size),
+            "-concurrency", str(self.config.concurrency),
+            "-timeout", str(self.config.timeout),
+            "-retries", str(self.config.retries),
+            "-severity", ",".join(severity_filter),
+            "-silent",
+            "-no-color"
+        ]
+
+        if workflow:
+            # The workflow already names its templates
+            cmd.extend(["-workflows", workflow])
+        else:
             # Add templates path if exists
             if os.path.exists(self.config.templates_path):
                 cmd.extend(["-templates", self.config.templates_path])
@@ -174,68 +228,78 @@ class NucleiEngine:
             if template_tags:
                 cmd.extend(["-tags", ",".join(template_tags)])
 
-            # Add authentication headers
-            if auth_context:
-                headers = []
-                if auth_context.get("bearer_token"):
-                    headers.append(f"Authorization: Bearer {auth_context['bearer_token']}")
-                if auth_context.get("headers"):
-                    for k, v in auth_context["headers"].items():
-                        headers.append(f"{k}: {v}")
-                if headers:
-                    for header in headers:
-                        cmd.extend(["-header", header])
-
-                # Add cookies
-                if auth_context.get("cookies"):
-                    cookie_str = "; ".join(
-                        f"{k}={v}" for k, v in auth_context["cookies"].items()
-                    )
-                    cmd.extend(["-header", f"Cookie: {cookie_str}"])
-
-            logger.info(f"Running Nuclei scan on {target.url}")
+        # Add authentication headers and cookies, each header name once
+        if auth_context:
+            bearer_token = auth_context.get("bearer_token")
+            cookies = auth_context.get("cookies")
+            seen = set()
+            for name, value in itertools.chain(
+                [("Authorization", f"Bearer {bearer_token}")] if bearer_token else [],
+                (auth_context.get("headers") or {}).items(),
+                [("Cookie", "; ".join(f"{k}={v}" for k, v in cookies.items()))] if cookies else []
+            ):
+                key = name.lower()
+                if key in seen:
+                    continue
+                seen.add(key)
+                cmd.extend(["-header", f"{name}: {value}"])
+
+        return cmd
+
+    async def _run(
+        self,
+        target_url: str,
+        auth_context: Optional[Dict],
+        severity_filter: Optional[List[str]],
+        template_tags: Optional[List[str]],
+        workflow: Optional[str],
+        on_result: Callable[[Dict], None]
+    ):
+        """Run Nuclei, passing each JSON result to on_result as it is reported"""
+        process = None
+
+        try:
+            cmd = self._build_command(target_url, auth_context, severity_filter, template_tags, workflow)
             logger.debug(f"Command: {' '.join(cmd)}")
 
-            # Run Nuclei
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.PIPE,
+                limit=STREAM_LIMIT
             )
 
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
+            async def read_results():
+                async for line in process.stdout:
+                    line = line.strip()
+                    if line:
+                        try:
+                            result = _json.loads(line)
+                        except _json.JSONDecodeError:
+                            continue
+                        on_result(result)
+
+            async def read_stderr():
+                # Drained line by line so a chatty scan neither fills the pipe nor memory
+                debug = logger.isEnabledFor(logging.DEBUG)
+                async for line in process.stderr:
+                    if debug:
+                        logger.debug(f"Nuclei stderr: {line.decode(errors='replace').rstrip()}")
+
+            await asyncio.wait_for(
+                asyncio.gather(read_results(), read_stderr(), process.wait()),
                 timeout=600  # 10 minute timeout
             )
 
-            if stderr:
-                logger.debug(f"Nuclei stderr: {stderr.decode()}")
-
-            # Parse results
-            if os.path.exists(results_path):
-                with open(results_path, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            try:
-                                result = json.loads(line)
-                                finding = self._result_to_finding(result)
-                                if finding:
-                                    findings.append(finding)
-                            except json.JSONDecodeError:
-                                continue
-
-                # Cleanup
-                os.unlink(results_path)
-
-            logger.info(f"Nuclei scan found {len(findings)} issues")
-
         except asyncio.TimeoutError:
             logger.error("Nuclei scan timed out")
         except Exception as e:
             logger.error(f"Nuclei scan error: {e}", exc_info=True)
-
-        return findings
+        finally:
+            # Kill and reap on every exit path, including cancellation
+            if process is not None and process.returncode is None:
+                process.kill()
+                await process.wait()
 
     def _result_to_finding(self, result: Dict) -> Optional[Any]:
         """Convert Nuclei result to Finding object"""
@@ -254,8 +318,7 @@ class NucleiEngine:
             matched_at = result.get("matched-at", result.get("host", ""))
             endpoint = "/"
             if matched_at:
-                from urllib.parse import urlparse
-                parsed = urlparse(matched_at)
+                parsed = _urlparse(matched_at)
                 endpoint = parsed.path or "/"
 
             # Determine OWASP category
@@ -263,17 +326,13 @@ class NucleiEngine:
             tags = info.get("tags", [])
             owasp_category = None
 
-            for key, category in self.OWASP_MAP.items():
-                if key in template_id or key in str(tags).lower():
-                    owasp_category = category
-                    break
+            tag_text = tags if isinstance(tags, str) else "\x00".join(map(str, tags))
+            matched = {m.group(1) for m in self._OWASP_KEYWORD_RE.finditer(f"{template_id}\x00{tag_text.lower()}")}
+            if matched:
+                owasp_category = self.OWASP_MAP[min(matched, key=self._OWASP_PRIORITY.__getitem__)]
 
             # Extract CVE if present
-            cve_id = None
-            for tag in tags:
-                if tag.upper().startswith("CVE-"):
-                    cve_id = tag.upper()
-                    break
+            cve_id = next((tag.upper() for tag in tags if _CVE_RE.match(tag)), None)
 
             # Get CWE
             cwe_id = None
@@ -321,37 +380,129 @@ class NucleiEngine:
 
     async def scan_cves(self, target: Any, auth_context: Optional[Dict] = None) -> List[Any]:
         """Scan specifically for known CVEs"""
-        return await self.scan(
-            target=target,
-            auth_context=auth_context,
-            template_tags=["cve"]
-        )
+        return await self._scan_specialty("cve", ["cve"], target, auth_context)
 
     async def scan_misconfigurations(self, target: Any, auth_context: Optional[Dict] = None) -> List[Any]:
         """Scan for security misconfigurations"""
-        return await self.scan(
-            target=target,
-            auth_context=auth_context,
-            template_tags=["misconfig", "misconfiguration", "exposure"]
+        return await self._scan_specialty(
+            "misconfig", ["misconfig", "misconfiguration", "exposure"], target, auth_context
         )
 
     async def scan_default_credentials(self, target: Any, auth_context: Optional[Dict] = None) -> List[Any]:
         """Scan for default/weak credentials"""
+        return await self._scan_specialty(
+            "default-login", ["default-login", "weak-credentials"], target, auth_context
+        )
+
+    async def _scan_specialty(
+        self,
+        name: str,
+        tags: List[str],
+        target: Any,
+        auth_context: Optional[Dict]
+    ) -> List[Any]:
+        """Run a tag-based scan through its cached workflow, falling back to -tags"""
+        workflow = await self._workflow_for(name, tags)
         return await self.scan(
             target=target,
             auth_context=auth_context,
-            template_tags=["default-login", "weak-credentials"]
+            template_tags=None if workflow else tags,
+            workflow=workflow
         )
 
+    def _templates_checksum(self, tags: List[str]) -> Optional[str]:
+        """Cheap fingerprint of the installed templates and a tag set"""
+        parts = [self.config.templates_path, ",".join(tags)]
+        for marker in _TEMPLATE_MARKERS:
+            try:
+                st = os.stat(os.path.join(self.config.templates_path, marker))
+            except OSError:
+                continue
+            parts.append(f"{marker}:{st.st_mtime_ns}:{st.st_size}")
+        if len(parts) == 2:
+            return None
+        return hashlib.blake2b("|".join(parts).encode(), digest_size=8).hexdigest()
+
+    async def _workflow_for(self, name: str, tags: List[str]) -> Optional[str]:
+        """
+        Path to a workflow listing the templates matching ``tags``.
+
+        The template tree is walked and filtered by tag once, via
+        ``nuclei -tl``; later scans load the listed templates directly. Files
+        are keyed by a checksum of the installed templates, so a template
+        update produces a new one. Returns None, so the caller falls back to
+        ``-tags``, if it cannot be built.
+        """
+        checksum = self._templates_checksum(tags)
+        if checksum is None:
+            return None
+
+        filename = f"{name}-{checksum}.yaml"
+        path = os.path.join(WORKFLOWS_DIR, filename)
+        if os.path.exists(path):
+            return path
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "nuclei", "-tl",
+                "-tags", ",".join(tags),
+                "-templates", self.config.templates_path,
+                "-silent",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await process.communicate()
+            if process.returncode != 0:
+                return None
+
+            templates = [
+                os.path.join(self.config.templates_path, line.strip())
+                for line in stdout.decode().splitlines()
+                if line.strip().endswith((".yaml", ".yml"))
+            ]
+            if not templates:
+                return None
+
+            workflow = {
+                "id": f"vulx-{name}",
+                "info": {"name": f"VULX {name} templates", "author": "vulx", "severity": "info"},
+                "workflows": [{"template": template} for template in templates]
+            }
+            os.makedirs(WORKFLOWS_DIR, exist_ok=True)
+            # Unique temp file, so concurrent scans never write the same one
+            fd, tmp_path = tempfile.mkstemp(dir=WORKFLOWS_DIR, prefix=f".{name}-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    yaml.safe_dump(workflow, f, sort_keys=False)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+            # Drop workflows built from earlier template versions
+            for stale in os.listdir(WORKFLOWS_DIR):
+                if stale.startswith(f"{name}-") and stale != filename:
+                    try:
+                        os.unlink(os.path.join(WORKFLOWS_DIR, stale))
+                    except OSError:
+                        pass
+
+            logger.info(f"Generated Nuclei workflow {name} with {len(templates)} templates")
+            return path
+
+        except Exception as e:
+            logger.debug(f"Could not build Nuclei workflow {name}: {e}")
+            return None
+
     async def update_templates(self) -> bool:
         """Update Nuclei templates to latest version"""
         try:
             process = await asyncio.create_subprocess_exec(
                 "nuclei", "-update-templates",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL
             )
-            stdout, stderr = await process.communicate()
+            await process.wait()
             logger.info("Nuclei templates updated")
             return True
         except Exception as e:
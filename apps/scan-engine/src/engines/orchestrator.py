@@ -16,25 +16,35 @@ Architecture:
 """
 
 import asyncio
+import heapq
 import logging
 import json
 import time
-from dataclasses import dataclass, field, asdict
-from typing import Optional, List, Dict, Any
+from dataclasses import dataclass, field, asdict, replace
+from typing import Optional, List, Dict, Any, Tuple
 from enum import Enum
 from datetime import datetime
+from operator import itemgetter
 import uuid
 
 from .zap_engine import ZAPEngine
 from .nuclei_engine import NucleiEngine
 from .schemathesis_engine import SchemathesisEngine
-from .auth_handler import AuthHandler, AuthConfig
+from .auth_handler import AuthHandler, AuthConfig, close_shared_connector
 from ..compliance.mapper import ComplianceMapper
 from ..remediation.engine import RemediationEngine
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Severity ranks for comparison; engines emit upper-case severities
+_SEV_RANK = {"CRITICAL": 5, "HIGH": 4, "MEDIUM": 3, "LOW": 2, "INFO": 1}
+
+# Risk score contribution per finding, capped at 100 overall
+_WEIGHTS = {"CRITICAL": 25, "HIGH": 15, "MEDIUM": 5, "LOW": 2, "INFO": 0}
+
+_SEV_COUNT_TEMPLATE = {"CRITICAL": 0, "HIGH": 0, "MEDIUM": 0, "LOW": 0, "INFO": 0}
+
 
 class ScanType(Enum):
     QUICK = "quick"           # Nuclei only - fast CVE check
@@ -56,7 +66,7 @@ class ScanStatus(Enum):
     FAILED = "FAILED"
 
 
-@dataclass
+@dataclass(slots=True)
 class ScanTarget:
     """Target configuration for security scan"""
     url: str
@@ -73,7 +83,7 @@ class ScanTarget:
     max_depth: int = 10    # crawl depth
 
 
-@dataclass
+@dataclass(slots=True)
 class Finding:
     """Security vulnerability finding"""
     id: str
@@ -95,7 +105,7 @@ class Finding:
     cve_id: Optional[str] = None
     cvss_score: Optional[float] = None
     owasp_category: Optional[str] = None
-    compliance_mappings: Dict[str, List[str]] = field(default_factory=dict)
+    compliance_mappings: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
     references: List[str] = field(default_factory=list)
     detected_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
 
@@ -103,7 +113,7 @@ class Finding:
         return asdict(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class ScanResult:
     """Complete scan result with all findings"""
     scan_id: str
@@ -122,7 +132,8 @@ class ScanResult:
     risk_score: int
 
     def to_dict(self) -> Dict[str, Any]:
-        result = asdict(self)
+        # Findings are converted once below rather than also inside asdict()
+        result = asdict(replace(self, findings=[]))
         result['findings'] = [f.to_dict() if hasattr(f, 'to_dict') else f for f in self.findings]
         return result
 
@@ -165,6 +176,18 @@ class ScanOrchestrator:
         self.db_url = db_url
 
         self._status_callbacks: List[callable] = []
+        # Scans in progress; the token refresher is stopped when this drops to zero
+        self._active_scans = 0
+
+    async def close(self):
+        """
+        Release authentication resources on application shutdown.
+
+        This also closes the connection pool shared by every auth flow in the
+        process, so call it once, after the last scan.
+        """
+        await self.auth_handler.close()
+        await close_shared_connector()
 
     def on_status_change(self, callback: callable):
         """Register callback for scan status changes"""
@@ -198,12 +221,16 @@ class ScanOrchestrator:
             ScanResult with all findings
         """
         scan_id = scan_id or str(uuid.uuid4())
-        started_at = datetime.utcnow()
+        started_at = datetime.utcnow().isoformat()
+        started = time.monotonic()
         all_findings: List[Finding] = []
         engines_used: List[str] = []
+        # Engines that raised, with their error, so consumers can see the gap
+        engines_failed: Dict[str, str] = {}
         auth_method = None
 
         logger.info(f"Starting {scan_type.value} scan for {target.url}")
+        self._active_scans += 1
 
         try:
             await self._update_status(scan_id, ScanStatus.INITIALIZING, 5, "Initializing scan engines")
@@ -216,40 +243,67 @@ class ScanOrchestrator:
                 auth_method = auth_config.method.value
                 logger.info(f"Authentication successful using {auth_method}")
 
-            # Phase 1: Quick scan with Nuclei (always runs)
-            await self._update_status(scan_id, ScanStatus.SCANNING_QUICK, 15, "Running quick vulnerability scan")
-            nuclei_findings = await self.nuclei_engine.scan(
-                target=target,
-                auth_context=auth_context,
-                severity_filter=["critical", "high", "medium", "low"]
-            )
-            all_findings.extend(nuclei_findings)
-            engines_used.append("nuclei")
-            logger.info(f"Nuclei scan complete: {len(nuclei_findings)} findings")
+            # Engines are independent once authenticated, so they run concurrently
+            # (label, status, start message, scan coroutine)
+            engines: List[Tuple[str, ScanStatus, str, Any]] = [(
+                # Quick scan with Nuclei (always runs)
+                "nuclei", ScanStatus.SCANNING_QUICK, "Running quick vulnerability scan",
+                self.nuclei_engine.scan(
+                    target=target,
+                    auth_context=auth_context,
+                    severity_filter=["critical", "high", "medium", "low"]
+                )
+            )]
 
             if scan_type in [ScanType.STANDARD, ScanType.FULL, ScanType.CONTINUOUS]:
-                # Phase 2: API Fuzzing with Schemathesis
+                # API Fuzzing with Schemathesis
                 if target.openapi_spec_url or target.openapi_spec_content:
-                    await self._update_status(scan_id, ScanStatus.SCANNING_FUZZING, 35, "Running API fuzzing tests")
-                    schema_findings = await self.schemathesis_engine.scan(
-                        target=target,
-                        auth_context=auth_context
-                    )
-                    all_findings.extend(schema_findings)
-                    engines_used.append("schemathesis")
-                    logger.info(f"Schemathesis scan complete: {len(schema_findings)} findings")
+                    engines.append((
+                        "schemathesis", ScanStatus.SCANNING_FUZZING, "Running API fuzzing tests",
+                        self.schemathesis_engine.scan(
+                            target=target,
+                            auth_context=auth_context
+                        )
+                    ))
 
             if scan_type in [ScanType.FULL, ScanType.CONTINUOUS]:
-                # Phase 3: Full DAST with OWASP ZAP
-                await self._update_status(scan_id, ScanStatus.SCANNING_DAST, 55, "Running deep DAST scan")
-                zap_findings = await self.zap_engine.scan(
-                    target=target,
-                    auth_context=auth_context,
-                    openapi_spec=target.openapi_spec_url or target.openapi_spec_content
+                # Full DAST with OWASP ZAP
+                engines.append((
+                    "zap", ScanStatus.SCANNING_DAST, "Running deep DAST scan",
+                    self.zap_engine.scan(
+                        target=target,
+                        auth_context=auth_context,
+                        openapi_spec=target.openapi_spec_url or target.openapi_spec_content
+                    )
+                ))
+
+            completed = 0
+
+            async def run_engine(name: str, status: ScanStatus, message: str, engine_scan) -> List[Finding]:
+                nonlocal completed
+                await self._update_status(scan_id, status, 15, message)
+                findings = await engine_scan
+                completed += 1
+                logger.info(f"{name} scan complete: {len(findings)} findings")
+                # Engine phases span 15-85% of overall progress
+                await self._update_status(
+                    scan_id, status, 15 + 70 * completed // len(engines), f"{name} scan complete"
                 )
-                all_findings.extend(zap_findings)
-                engines_used.append("zap")
-                logger.info(f"ZAP scan complete: {len(zap_findings)} findings")
+                return findings
+
+            results = await asyncio.gather(*(run_engine(*engine) for engine in engines), return_exceptions=True)
+
+            # Collect in a fixed engine order so deduplication is deterministic
+            for (name, *_), result in zip(engines, results):
+                if isinstance(result, BaseException):
+                    logger.error(f"{name} scan failed: {result}", exc_info=result)
+                    engines_failed[name] = str(result) or type(result).__name__
+                    continue
+                all_findings.extend(result)
+                engines_used.append(name)
+
+            if not engines_used:
+                raise RuntimeError(f"All scan engines failed: {', '.join(engines_failed)}")
 
             # Phase 4: Analyze and enrich findings
             await self._update_status(scan_id, ScanStatus.ANALYZING, 85, "Analyzing and enriching findings")
@@ -257,34 +311,42 @@ class ScanOrchestrator:
             # Deduplicate findings
             all_findings = self._deduplicate_findings(all_findings)
 
-            # Add compliance mappings
-            for finding in all_findings:
-                finding.compliance_mappings = self.compliance_mapper.map_finding(finding)
-
-            # Add remediation suggestions
+            # Add compliance mappings and remediation suggestions. Both depend only on
+            # (type, cwe_id, owasp_category), so each distinct key is resolved once.
+            map_finding = self.compliance_mapper.map_finding
+            get_remediation = self.remediation_engine.get_remediation
+            enrichment: Dict[Tuple[str, Optional[str], Optional[str]], Tuple] = {}
             for finding in all_findings:
-                remediation = self.remediation_engine.get_remediation(finding)
-                finding.remediation = remediation.description
-                finding.code_fix = remediation.code_example
+                key = (finding.type, finding.cwe_id, finding.owasp_category)
+                cached = enrichment.get(key)
+                if cached is None:
+                    remediation = get_remediation(finding)
+                    cached = enrichment[key] = (
+                        map_finding(finding), remediation.description, remediation.code_example
+                    )
+                mappings, finding.remediation, finding.code_fix = cached
+                finding.compliance_mappings = dict(mappings)
 
             # Calculate metrics
-            completed_at = datetime.utcnow()
-            duration = int((completed_at - started_at).total_seconds())
+            completed_at = datetime.utcnow().isoformat()
+            duration = int(time.monotonic() - started)
 
-            summary = self._calculate_summary(all_findings)
-            coverage = self._calculate_coverage(target, all_findings, engines_used)
+            summary, coverage, risk_score = self._finalize(target, all_findings, engines_used, engines_failed)
             compliance_summary = self.compliance_mapper.get_summary(all_findings)
-            risk_score = self._calculate_risk_score(all_findings)
 
-            await self._update_status(scan_id, ScanStatus.COMPLETED, 100, "Scan completed successfully")
+            await self._update_status(
+                scan_id, ScanStatus.COMPLETED, 100,
+                f"Scan completed; failed engines: {', '.join(engines_failed)}" if engines_failed
+                else "Scan completed successfully"
+            )
 
             return ScanResult(
                 scan_id=scan_id,
                 target_url=target.url,
                 scan_type=scan_type.value,
                 status=ScanStatus.COMPLETED.value,
-                started_at=started_at.isoformat(),
-                completed_at=completed_at.isoformat(),
+                started_at=started_at,
+                completed_at=completed_at,
                 duration_seconds=duration,
                 findings=all_findings,
                 summary=summary,
@@ -304,9 +366,9 @@ class ScanOrchestrator:
                 target_url=target.url,
                 scan_type=scan_type.value,
                 status=ScanStatus.FAILED.value,
-                started_at=started_at.isoformat(),
+                started_at=started_at,
                 completed_at=datetime.utcnow().isoformat(),
-                duration_seconds=int((datetime.utcnow() - started_at).total_seconds()),
+                duration_seconds=int(time.monotonic() - started),
                 findings=[],
                 summary={"error": str(e)},
                 engines_used=engines_used,
@@ -316,97 +378,86 @@ class ScanOrchestrator:
                 risk_score=0
             )
 
+        finally:
+            self._active_scans -= 1
+            if not self._active_scans:
+                # Stop the token refresher so it does not outlive the scans using it;
+                # cached tokens and the shared connection pool are kept for the next scan
+                await self.auth_handler.close()
+
     def _deduplicate_findings(self, findings: List[Finding]) -> List[Finding]:
         """Remove duplicate findings based on type, endpoint, and parameter"""
-        seen = set()
-        unique = []
+        # Insertion order keeps each key at its first occurrence
+        best: Dict[Tuple, Finding] = {}
+        rank = _SEV_RANK.get
 
         for finding in findings:
             key = (finding.type, finding.endpoint, finding.method, finding.parameter)
-            if key not in seen:
-                seen.add(key)
-                unique.append(finding)
-            else:
-                # Keep the finding with higher severity
-                for i, existing in enumerate(unique):
-                    existing_key = (existing.type, existing.endpoint, existing.method, existing.parameter)
-                    if existing_key == key:
-                        if self._severity_rank(finding.severity) > self._severity_rank(existing.severity):
-                            unique[i] = finding
-                        break
-
-        return unique
-
-    def _severity_rank(self, severity: str) -> int:
-        """Convert severity to numeric rank for comparison"""
-        ranks = {"CRITICAL": 5, "HIGH": 4, "MEDIUM": 3, "LOW": 2, "INFO": 1}
-        return ranks.get(severity.upper(), 0)
-
-    def _calculate_summary(self, findings: List[Finding]) -> Dict[str, Any]:
-        """Calculate summary statistics for findings"""
-        severity_counts = {"CRITICAL": 0, "HIGH": 0, "MEDIUM": 0, "LOW": 0, "INFO": 0}
-        by_type = {}
-        by_endpoint = {}
-        by_engine = {}
+            current = best.get(key)
+            # Keep the finding with higher severity
+            if current is None or rank(finding.severity, 0) > rank(current.severity, 0):
+                best[key] = finding
+
+        return list(best.values())
+
+    def _finalize(
+        self,
+        target: ScanTarget,
+        findings: List[Finding],
+        engines_used: List[str],
+        engines_failed: Dict[str, str]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], int]:
+        """
+        Summary statistics, coverage metrics and risk score (0-100, higher
+        is riskier) in a single pass over the findings.
+        """
+        severity_counts = dict(_SEV_COUNT_TEMPLATE)
+        by_type: Dict[str, int] = {}
+        by_endpoint: Dict[str, int] = {}
+        by_engine: Dict[str, int] = {}
+        methods_tested = set()
+        owasp_categories = set()
 
         for finding in findings:
-            severity_counts[finding.severity] = severity_counts.get(finding.severity, 0) + 1
+            severity = finding.severity
+            try:
+                severity_counts[severity] += 1
+            except KeyError:
+                severity_counts[severity] = 1
             by_type[finding.type] = by_type.get(finding.type, 0) + 1
             by_endpoint[finding.endpoint] = by_endpoint.get(finding.endpoint, 0) + 1
             by_engine[finding.engine] = by_engine.get(finding.engine, 0) + 1
+            methods_tested.add(finding.method)
+            if finding.owasp_category:
+                owasp_categories.add(finding.owasp_category)
+
+        # Weights are non-negative, so scoring the per-severity totals matches
+        # a per-finding running sum capped at 100
+        weight = _WEIGHTS.get
+        risk = sum(weight(severity, 0) * count for severity, count in severity_counts.items())
 
-        return {
+        summary = {
             "total": len(findings),
             "by_severity": severity_counts,
             "by_type": by_type,
-            "by_endpoint": dict(sorted(by_endpoint.items(), key=lambda x: x[1], reverse=True)[:10]),
+            "by_endpoint": dict(heapq.nlargest(10, by_endpoint.items(), key=itemgetter(1))),
             "by_engine": by_engine,
             "critical_count": severity_counts["CRITICAL"],
             "high_count": severity_counts["HIGH"],
             "actionable": severity_counts["CRITICAL"] + severity_counts["HIGH"]
         }
 
-    def _calculate_coverage(
-        self,
-        target: ScanTarget,
-        findings: List[Finding],
-        engines_used: List[str]
-    ) -> Dict[str, Any]:
-        """Calculate scan coverage metrics"""
-        endpoints_tested = set(f.endpoint for f in findings)
-        methods_tested = set(f.method for f in findings)
-
-        return {
-            "endpoints_discovered": len(endpoints_tested),
+        coverage = {
+            "endpoints_discovered": len(by_endpoint),
             "http_methods_tested": list(methods_tested),
             "engines_used": engines_used,
+            "engines_failed": engines_failed,
             "authenticated": target is not None,
             "depth_reached": target.max_depth,
-            "owasp_categories_covered": list(set(
-                f.owasp_category for f in findings if f.owasp_category
-            ))
+            "owasp_categories_covered": list(owasp_categories)
         }
 
-    def _calculate_risk_score(self, findings: List[Finding]) -> int:
-        """
-        Calculate overall risk score (0-100).
-        Higher score = more risk
-        """
-        if not findings:
-            return 0
-
-        weights = {
-            "CRITICAL": 25,
-            "HIGH": 15,
-            "MEDIUM": 5,
-            "LOW": 2,
-            "INFO": 0
-        }
-
-        total_weight = sum(weights.get(f.severity, 0) for f in findings)
-
-        # Cap at 100
-        return min(100, total_weight)
+        return summary, coverage, min(100, risk)
 
 
 # Singleton instance for worker usage
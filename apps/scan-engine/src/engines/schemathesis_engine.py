@@ -15,7 +15,9 @@ import asyncio
 import logging
 import json
 import subprocess
+import itertools
 import os
+import re
 import tempfile
 import uuid
 from typing import Optional, List, Dict, Any
@@ -23,8 +25,18 @@ from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# "test_api[GET /path]" -> "GET /path"; text from the first "[" to the first "]"
+_TEST_PARAMS_RE = re.compile(r"^[^\[\]]*\[([^\]]*)\]")
 
-@dataclass
+# First whitespace-delimited HTTP method token and the token that follows it
+_METHOD_LINE_RE = re.compile(r"(?<!\S)(GET|POST|PUT|DELETE|PATCH)(?!\S)(?:\s+(\S+))?")
+
+# Failure kinds in priority order; lookaheads let an earlier kind win wherever it appears
+_FAIL_KINDS = ("status_code_conformance", "content_type_conformance", "response_schema_conformance")
+_FAIL_KIND_RE = re.compile(r"(?=.*(status_code))|(?=.*(content_type))|(?=.*(schema))", re.I | re.S)
+
+
+@dataclass(slots=True)
 class SchemathesisConfig:
     """Schemathesis configuration"""
     hypothesis_max_examples: int = 100
@@ -127,14 +139,12 @@ class SchemathesisEngine:
             logger.warning("No OpenAPI spec provided for Schemathesis")
             return findings
 
+        results_path = None
+        process = None
         try:
-            # Create temp file for results
-            with tempfile.NamedTemporaryFile(
-                mode='w',
-                suffix='.json',
-                delete=False
-            ) as results_file:
-                results_path = results_file.name
+            # Create temp file for results (created O_EXCL under a random name)
+            fd, results_path = tempfile.mkstemp(suffix='.json')
+            os.close(fd)
 
             # Build Schemathesis command
             cmd = [
@@ -150,8 +160,7 @@ class SchemathesisEngine:
             ]
 
             # Add checks
-            for check in self.config.checks:
-                cmd.extend(["--checks", check])
+            cmd += itertools.chain.from_iterable(("--checks", check) for check in self.config.checks)
 
             # Enable stateful testing
             if self.config.stateful:
@@ -165,8 +174,9 @@ class SchemathesisEngine:
                         f"Authorization: Bearer {auth_context['bearer_token']}"
                     ])
                 if auth_context.get("headers"):
-                    for k, v in auth_context["headers"].items():
-                        cmd.extend(["--header", f"{k}: {v}"])
+                    cmd += itertools.chain.from_iterable(
+                        ("--header", f"{k}: {v}") for k, v in auth_context["headers"].items()
+                    )
                 if auth_context.get("cookies"):
                     cookie_str = "; ".join(
                         f"{k}={v}" for k, v in auth_context["cookies"].items()
@@ -196,7 +206,6 @@ class SchemathesisEngine:
             # Also try to parse the JUnit XML if created
             if os.path.exists(results_path):
                 findings.extend(self._parse_junit_results(results_path, target.url))
-                os.unlink(results_path)
 
             # Deduplicate findings
             seen = set()
@@ -214,6 +223,15 @@ class SchemathesisEngine:
             logger.error("Schemathesis scan timed out")
         except Exception as e:
             logger.error(f"Schemathesis scan error: {e}", exc_info=True)
+        finally:
+            # Kill and reap on every exit path, including timeouts and cancellation,
+            # so Schemathesis cannot recreate the results file after it is removed
+            if process is not None and process.returncode is None:
+                process.kill()
+                await process.wait()
+            # Removed on every path, including timeouts and parse failures
+            if results_path and os.path.exists(results_path):
+                os.unlink(results_path)
 
         return findings
 
@@ -229,46 +247,57 @@ class SchemathesisEngine:
             current_endpoint = None
             current_method = None
 
+            # Hoisted out of the per-line loop; outputs can run to megabytes
+            append = findings.append
+            method_search = _METHOD_LINE_RE.search
+            kind_match = _FAIL_KIND_RE.match
+            new_id = uuid.uuid4
+            severity_for = self.FAILURE_SEVERITY_MAP.get
+            owasp_for = self.OWASP_MAP.get
+            # failure_type -> (type, title, severity, owasp_category, cwe_id)
+            kind_fields: Dict[str, tuple] = {}
+
             for line in lines:
                 line = line.strip()
 
                 # Detect endpoint being tested
-                if " -> " in line and any(m in line for m in ["GET", "POST", "PUT", "DELETE", "PATCH"]):
-                    parts = line.split()
-                    for i, part in enumerate(parts):
-                        if part in ["GET", "POST", "PUT", "DELETE", "PATCH"]:
-                            current_method = part
-                            if i + 1 < len(parts):
-                                current_endpoint = parts[i + 1]
-                            break
+                if " -> " in line:
+                    match = method_search(line)
+                    if match:
+                        current_method = match.group(1)
+                        if match.group(2):
+                            current_endpoint = match.group(2)
 
                 # Detect failures
                 if "FAILED" in line or "ERROR" in line:
-                    failure_type = "server_error"
-
-                    if "status_code" in line.lower():
-                        failure_type = "status_code_conformance"
-                    elif "content_type" in line.lower():
-                        failure_type = "content_type_conformance"
-                    elif "schema" in line.lower():
-                        failure_type = "response_schema_conformance"
-                    elif "500" in line or "Internal Server Error" in line:
-                        failure_type = "server_error"
+                    kind = kind_match(line)
+                    failure_type = _FAIL_KINDS[kind.lastindex - 1] if kind else "server_error"
 
                     if current_endpoint:
-                        findings.append(Finding(
-                            id=f"schema-{failure_type}-{uuid.uuid4().hex[:8]}",
+                        fields = kind_fields.get(failure_type)
+                        if fields is None:
+                            label = failure_type.replace('_', ' ')
+                            fields = kind_fields[failure_type] = (
+                                f"API Fuzzing: {label.title()}",
+                                f"API endpoint fails {label} check",
+                                severity_for(failure_type, "MEDIUM"),
+                                owasp_for(failure_type),
+                                "CWE-20" if "validation" in failure_type else "CWE-754",
+                            )
+                        finding_type, title, severity, owasp_category, cwe_id = fields
+                        append(Finding(
+                            id=f"schema-{failure_type}-{new_id().hex[:8]}",
                             engine="schemathesis",
-                            type=f"API Fuzzing: {failure_type.replace('_', ' ').title()}",
-                            severity=self.FAILURE_SEVERITY_MAP.get(failure_type, "MEDIUM"),
+                            type=finding_type,
+                            severity=severity,
                             confidence="HIGH",
-                            title=f"API endpoint fails {failure_type.replace('_', ' ')} check",
+                            title=title,
                             description=f"The API endpoint returned unexpected behavior during fuzz testing. This could indicate improper input validation or error handling.",
                             endpoint=current_endpoint,
                             method=current_method or "GET",
                             evidence=line,
-                            owasp_category=self.OWASP_MAP.get(failure_type),
-                            cwe_id="CWE-20" if "validation" in failure_type else "CWE-754"
+                            owasp_category=owasp_category,
+                            cwe_id=cwe_id
                         ))
 
         except Exception as e:
@@ -284,21 +313,25 @@ class SchemathesisEngine:
         findings = []
 
         try:
-            tree = ET.parse(results_path)
-            root = tree.getroot()
+            # Open elements, innermost last, so a finished testcase can be detached
+            parents = []
+            for event, testcase in ET.iterparse(results_path, events=("start", "end")):
+                if event == "start":
+                    parents.append(testcase)
+                    continue
+                parents.pop()
+                if testcase.tag != "testcase":
+                    continue
 
-            for testcase in root.findall(".//testcase"):
                 name = testcase.get("name", "")
-                classname = testcase.get("classname", "")
 
                 # Parse endpoint and method from test name
                 endpoint = "/"
                 method = "GET"
 
-                if "[" in name and "]" in name:
-                    # Format: "test_api[GET /path]"
-                    bracket_content = name[name.find("[")+1:name.find("]")]
-                    parts = bracket_content.split()
+                match = _TEST_PARAMS_RE.match(name)
+                if match:
+                    parts = match.group(1).split()
                     if len(parts) >= 2:
                         method = parts[0]
                         endpoint = parts[1]
@@ -334,6 +367,10 @@ class SchemathesisEngine:
                         cwe_id="CWE-754"
                     ))
 
+                # Detach the parsed testcase from its testsuite so memory stays flat on large reports
+                if parents:
+                    parents[-1].remove(testcase)
+
         except Exception as e:
             logger.error(f"Error parsing JUnit results: {e}")
 